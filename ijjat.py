@@ -1,90 +1,15 @@
-import os
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
+import shlex
+
 from dotenv import load_dotenv
 
-from llama_index.core import VectorStoreIndex, StorageContext, load_index_from_storage
-from llama_index.core.schema import TextNode
-from llama_index.embeddings.fastembed import FastEmbedEmbedding
-from llama_index.core.settings import Settings
-from llama_index.llms.groq import Groq
-from llama_index.core.response_synthesizers import CompactAndRefine
+from shl_recommender import build_query_engine, extract_text_from_url, format_duration, is_url, load_or_build_index
+from shl_recommender.tracing import start_trace
 
 load_dotenv()
 
-# --- Set up Llama 4 model from Groq ---
-model_name = "meta-llama/llama-4-scout-17b-16e-instruct"
-Settings.llm = Groq(model=model_name, api_key=os.getenv("GROQ_API_KEY"))
-
-# --- Set embedding model ---
-Settings.embed_model = FastEmbedEmbedding(model_name="BAAI/bge-large-en-v1.5")
-
-def extract_text_from_url(url: str) -> str:
-    try:
-        response = requests.get(url)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        paragraphs = soup.find_all('p')
-        page_text = "\n".join([p.get_text() for p in paragraphs if p.get_text(strip=True)])
-        return page_text[:2000]  # limit characters for safety
-    except Exception as e:
-        print(f"❌ Failed to fetch or parse URL: {e}")
-        return ""
-
-def load_shl_data_with_metadata(csv_path: str):
-    df = pd.read_csv(csv_path)
-    documents = []
-
-    for _, row in df.iterrows():
-        assessment_name = str(row['Assessment Name'])
-        description = str(row['Description'])
-        assessment_type = str(row['Types']).strip()
-        raw_duration = str(row['Assessment Length (minutes)']).strip()
-        remote = str(row['Remote Support']).strip()
-        adaptive = str(row['Adaptive Support']).strip()
-        job_levels = str(row['Job Levels']).strip()
-        url = str(row['URL']).strip()
-
-        try:
-            minutes = int(float(raw_duration))
-            if minutes == 9999:
-                duration_clean = "Untimed"
-            elif minutes == -1:
-                duration_clean = "Variable"
-            else:
-                duration_clean = f"{minutes} minutes"
-        except ValueError:
-            duration_clean = "Variable"
-            minutes = -1
-
-        text = f"""
-        Assessment: {assessment_name}
-        Description: {description}
-        Type: {assessment_type}
-        Duration: {duration_clean}
-        Remote: {remote}
-        Adaptive: {adaptive}
-        Job Levels: {job_levels}
-        URL: {url}
-        """
-
-        metadata = {
-            "assessment_name": assessment_name,
-            "type": assessment_type,
-            "duration_minutes": minutes,
-            "duration": duration_clean,
-            "remote": remote,
-            "adaptive": adaptive,
-            "job_levels": job_levels,
-            "url": url
-        }
-
-        node = TextNode(text=text.strip(), metadata=metadata)
-        documents.append(node)
-
-    return documents
-
 def display_results_table(nodes):
+    import pandas as pd
+
     rows = []
     for node in nodes:
         meta = node.node.metadata
@@ -95,7 +20,7 @@ def display_results_table(nodes):
         rows.append({
             "Assessment Name": name_link,
             "Type": meta.get("type", ""),
-            "Duration": meta.get("duration", "Variable"),
+            "Duration": format_duration(meta.get("duration_minutes", -1)),
             "Remote Support": meta.get("remote", ""),
             "Adaptive Support": meta.get("adaptive", ""),
             "Job Levels": meta.get("job_levels", "")
@@ -107,40 +32,42 @@ def display_results_table(nodes):
     print(df.to_markdown(index=False))
 
 def main():
-    csv_path = "rex.csv"
+    catalog_path = "catalog.parquet"  # normalized from the scraped CSVs on first use
     persist_dir = "shl_index"
 
-    if not os.path.exists(persist_dir):
-        print("📄 Creating new index from:", csv_path)
-        nodes = load_shl_data_with_metadata(csv_path)
-        print(f"✅ Loaded {len(nodes)} assessments.")
-        index = VectorStoreIndex(nodes)
-        index.storage_context.persist(persist_dir=persist_dir)
-        print("💾 Index saved to 'shl_index' folder.")
-    else:
-        print("📦 Loading existing index from disk...")
-
     # --- Load persisted index ---
-    storage_context = StorageContext.from_defaults(persist_dir=persist_dir)
-    index = load_index_from_storage(storage_context)
+    index = load_or_build_index(catalog_path, persist_dir)
 
     # --- Get input ---
     input_query = input("\n🔍 Enter a job description (or URL):\n").strip()
 
-    if input_query.startswith("http://") or input_query.startswith("https://"):
-        input_query = extract_text_from_url(input_query)
+    # SHL_TRACE=1 records per-stage timings (SHL_TRACE_JSONL / SHL_TRACE_OPIK to export)
+    with start_trace("ijjat"):
+        candidates = answer_query(index, input_query)
+
+    if candidates is not None:
+        refine_results(candidates)
+
+def answer_query(index, input_query: str):
+    if is_url(input_query):
+        input_query = extract_text_from_url(input_query)  # long postings are chunked at query time
 
     if not input_query:
         print("❗ No input provided. Exiting.")
         return
 
+    from llama_index.core.schema import QueryBundle
+    from llama_index.core.settings import Settings
+
+    from shl_recommender.coarse import embed_query_bundle
+    from shl_recommender.facets import FacetedSearch
+
     # --- Query the index ---
-    query_engine = index.as_query_engine(
-        similarity_top_k=10,
-        response_mode="compact_and_refine",
-        response_synthesizer=CompactAndRefine()
-    )
-    response = query_engine.query(input_query)
+    # Embed once: the top 200 are kept for refining, the LLM summarizes the top 10
+    query_engine = build_query_engine(index, similarity_top_k=10)
+    query_bundle = embed_query_bundle(QueryBundle(input_query), Settings.embed_model)
+    candidates = FacetedSearch(index, candidate_k=200).candidates(query_bundle)
+    response = query_engine.query(query_bundle)
 
     # --- Display results ---
     display_results_table(response.source_nodes)
@@ -148,6 +75,48 @@ def main():
     # --- LLM Final Response ---
     print("\n🧠 LLM Final Response:\n")
     print(response.response)
+    return candidates
+
+
+# --- Narrow or page through the cached candidates without searching again ---
+REFINE_KEYS = {"remote": str, "adaptive": str, "type": str, "job_level": str, "max_duration": int, "page": int}
+
+
+def parse_refinement(line: str) -> dict:
+    refinement = {}
+    for token in shlex.split(line):
+        key, _, value = token.partition("=")
+        if key not in REFINE_KEYS or not value:
+            raise ValueError(f"Unknown refinement '{token}' (use {', '.join(REFINE_KEYS)})")
+        if key == "type":
+            refinement.setdefault("types", []).append(value)
+        else:
+            refinement[key] = REFINE_KEYS[key](value)
+    return refinement
+
+
+def print_facets(facets: dict):
+    for name, counts in facets.items():
+        print(f"  {name}: " + ", ".join(f"{label} ({count})" for label, count in counts.items()))
+
+
+def refine_results(candidates):
+    print(f"\n🎛️ Facets over the top {len(candidates)} candidates:")
+    print_facets(candidates.facets())
+    while True:
+        line = input('\n🎛️ Refine (e.g. remote=Yes type="Knowledge & Skills" max_duration=30 page=2), Enter to quit:\n').strip()
+        if not line:
+            return
+        try:
+            refinement = parse_refinement(line)
+        except ValueError as e:
+            print(f"❗ {e}")
+            continue
+        page = refinement.pop("page", 1)
+        result = candidates.page(page, 10, **refinement)
+        display_results_table(result["results"])
+        print(f"\n📄 Page {result['page']} of {result['pages']} ({result['total']} matching assessments)")
+        print_facets(result["facets"])
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,25 @@
+# Heavy dependencies (llama_index, pandas, Groq, FastEmbed, bs4) are imported
+# inside the functions below, so importing the package stays cheap.
+from .index import load_index, load_or_build_index
+from .ingestion import build_index, format_duration, iter_shl_nodes, load_shl_data_with_metadata
+from .jd import extract_text_from_url, is_url
+from .query import build_query_engine
+from .settings import CATALOG_PATH, CSV_PATH, PERSIST_DIR, configure_settings
+from .streaming import build_index_chunked
+
+__all__ = [
+    "CATALOG_PATH",
+    "CSV_PATH",
+    "PERSIST_DIR",
+    "build_index",
+    "build_index_chunked",
+    "build_query_engine",
+    "configure_settings",
+    "extract_text_from_url",
+    "format_duration",
+    "is_url",
+    "iter_shl_nodes",
+    "load_index",
+    "load_or_build_index",
+    "load_shl_data_with_metadata",
+]
@@ -0,0 +1,244 @@
+"""Latency and relevance benchmark for the retrieval configurations.
+
+Usage: python -m shl_recommender.benchmark [--queries benchmarks/queries.jsonl] [--k 10]
+       [--repeat 5] [--configs vector,two_stage,...] [--output results.json]
+
+Each configuration runs in its own subprocess so peak RSS is attributable to it.
+The end-to-end configuration swaps Groq for llama-index's MockLLM.
+"""
+import argparse
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from .settings import PERSIST_DIR
+
+CONFIGS = ["faiss_flat", "vector", "two_stage", "hybrid", "vector_rerank", "hybrid_rerank", "e2e_stub_llm"]
+RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+CANDIDATE_K = 50
+
+
+def load_queries(path: str):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# --- Relevance metrics ---
+def recall_at_k(retrieved, relevant, k: int) -> float:
+    if not relevant:
+        return 0.0
+    return len(set(retrieved[:k]) & set(relevant)) / len(set(relevant))
+
+
+def average_precision_at_k(retrieved, relevant, k: int) -> float:
+    relevant = set(relevant)
+    if not relevant:
+        return 0.0
+    hits, score, seen = 0, 0.0, set()
+    for rank, url in enumerate(retrieved[:k], start=1):
+        if url in relevant and url not in seen:
+            hits += 1
+            score += hits / rank
+        seen.add(url)
+    return score / min(len(relevant), k)
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+# --- Search functions, one per configuration: query dict -> ranked URLs ---
+def _faiss_search_fn(k: int):
+    import faiss
+    import numpy as np
+    import pandas as pd
+    from sentence_transformers import SentenceTransformer
+
+    # Same model and index layout as RAG.py; reuse its artifacts when present
+    model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+    if os.path.exists("shl_index.faiss") and os.path.exists("shl_metadata.pkl"):
+        index = faiss.read_index("shl_index.faiss")
+        df = pd.read_pickle("shl_metadata.pkl")
+    else:
+        df = pd.read_csv("final.csv")
+        columns = ["Assessment Name", "URL", "Remote Support", "Adaptive Support", "Types", "Description", "Job Levels", "Languages"]
+        texts = df[columns].astype(str).agg(" | ".join, axis=1).tolist()
+        embeddings = np.asarray(model.encode(texts), dtype="float32")
+        index = faiss.IndexFlatL2(embeddings.shape[1])
+        index.add(embeddings)
+
+    def search(q):
+        embedding = np.asarray(model.encode([q["query"]]), dtype="float32")
+        _, ids = index.search(embedding, k)
+        return df.iloc[ids[0]]["URL"].tolist()
+
+    return search
+
+
+def _urls(nodes):
+    return [n.node.metadata.get("url", "") for n in nodes]
+
+
+def _retriever_search_fn(config: str, k: int, persist_dir: str):
+    from .filters import matches_filters
+    from .index import load_index
+    from .query import build_retriever
+
+    index = load_index(persist_dir)
+    rerank = config.endswith("_rerank")
+    hybrid = config.startswith("hybrid")
+    search_mode = "two_stage" if config == "two_stage" else "dense"
+    candidate_k = CANDIDATE_K if (rerank or hybrid) else k
+    retriever = build_retriever(index, candidate_k, search_mode)
+
+    reranker = None
+    if rerank:
+        from llama_index.core.postprocessor import SentenceTransformerRerank
+
+        reranker = SentenceTransformerRerank(model=RERANK_MODEL, top_n=k)
+
+    def search(q):
+        nodes = retriever.retrieve(q["query"])
+        if hybrid:
+            nodes = [n for n in nodes if matches_filters(n.node.metadata, **q.get("filters", {}))]
+        if reranker is not None and nodes:
+            nodes = reranker.postprocess_nodes(nodes, query_str=q["query"])
+        return _urls(nodes[:k])
+
+    return search
+
+
+def _e2e_search_fn(k: int, persist_dir: str):
+    from llama_index.core.llms import MockLLM
+
+    from .index import load_index
+    from .query import build_query_engine
+
+    index = load_index(persist_dir)
+    # Neither the answer cache nor template hits: every query pays the full path
+    query_engine = build_query_engine(
+        index, similarity_top_k=k, search_mode="dense", cache_ttl_seconds=0, template_cache=False,
+        llm=MockLLM(max_tokens=64),
+    )
+
+    def search(q):
+        return _urls(query_engine.query(q["query"]).source_nodes)
+
+    return search
+
+
+def make_search_fn(config: str, k: int, persist_dir: str):
+    if config == "faiss_flat":
+        return _faiss_search_fn(k)
+    if config == "e2e_stub_llm":
+        return _e2e_search_fn(k, persist_dir)
+    if config in CONFIGS:
+        return _retriever_search_fn(config, k, persist_dir)
+    raise ValueError(f"Unknown benchmark config: {config}")
+
+
+# --- Run one configuration in this process ---
+def run_config(config: str, queries, k: int = 10, repeat: int = 5, persist_dir: str = PERSIST_DIR) -> dict:
+    search = make_search_fn(config, k, persist_dir)
+    search(queries[0])  # warm-up: model load and first-call overheads
+
+    latencies, recalls, aps = [], [], []
+    started = time.perf_counter()
+    for i in range(repeat):
+        for q in queries:
+            t0 = time.perf_counter()
+            retrieved = search(q)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if i == 0:
+                recalls.append(recall_at_k(retrieved, q["relevant_urls"], k))
+                aps.append(average_precision_at_k(retrieved, q["relevant_urls"], k))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "config": config,
+        "queries": len(queries),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "throughput_qps": len(latencies) / elapsed if elapsed else 0.0,
+        # ru_maxrss is reported in KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        f"recall@{k}": sum(recalls) / len(recalls),
+        f"map@{k}": sum(aps) / len(aps),
+    }
+
+
+# --- Subprocess runs and the results table (shared with the embeddings CLI) ---
+def run_isolated(module: str, key: str, name: str, flags) -> dict:
+    # `python -m <module> --single <name>` prints its result as the last stdout line
+    cmd = [sys.executable, "-m", module, "--single", name, *flags]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        return {key: name, "error": result.stderr.strip().splitlines()[-1] if result.stderr else "failed"}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def format_table(results, columns) -> str:
+    # The first column names the row; error rows keep just that and the message
+    lines = ["| " + " | ".join(columns) + " |", "|" + "---|" * len(columns)]
+    for row in results:
+        if "error" in row:
+            lines.append(f"| {row[columns[0]]} | error: {row['error']} |")
+            continue
+        cells = [_format_cell(c, row[c]) for c in columns]
+        lines.append("| " + " | ".join(cells) + " |")
+    return "\n".join(lines)
+
+
+def _format_cell(column: str, value) -> str:
+    if not isinstance(value, float):
+        return str(value)
+    return f"{value:.3f}" if "@" in column else f"{value:.1f}"
+
+
+def format_results(results, k: int) -> str:
+    return format_table(
+        results, ["config", "p50_ms", "p95_ms", "p99_ms", "throughput_qps", "peak_rss_mb", f"recall@{k}", f"map@{k}"]
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", default="benchmarks/queries.jsonl")
+    parser.add_argument("--configs", default=",".join(CONFIGS))
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--persist-dir", default=PERSIST_DIR)
+    parser.add_argument("--output", help="Write the raw results as JSON to this path")
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    queries = load_queries(args.queries)
+    if args.single:
+        print(json.dumps(run_config(args.single, queries, args.k, args.repeat, args.persist_dir)))
+        return 0
+
+    results = []
+    for config in args.configs.split(","):
+        print(f"⏱️ Benchmarking {config}...", file=sys.stderr)
+        flags = ["--queries", args.queries, "--k", str(args.k), "--repeat", str(args.repeat),
+                 "--persist-dir", args.persist_dir]
+        results.append(run_isolated("shl_recommender.benchmark", "config", config, flags))
+
+    print(format_results(results, args.k))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0 if all("error" not in r for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
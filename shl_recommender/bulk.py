@@ -0,0 +1,200 @@
+"""Offline scoring of job profiles against the whole catalog.
+
+Usage: python -m shl_recommender.bulk --profiles profiles.csv --out scores.parquet
+       [--persist-dir shl_index] [--top-k 20] [--batch-size 256] [--block-size 2048] [--workers N]
+       [--max-duration 60] [--job-level Mid] [--remote Yes] [--adaptive No] [--language French]
+
+Profiles are read from CSV or JSONL with an `id` and a `text` column. Rows may
+also carry max_duration / job_level / remote / adaptive / language columns,
+which override the command-line constraints for that profile. Profiles are
+embedded in batches and each batch is scored against catalog blocks on a
+thread pool; only the top-k per profile is kept, and every batch is appended
+to the Parquet file as soon as it is scored.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+from .filters import matches_filters
+from .settings import PERSIST_DIR
+
+CONSTRAINT_COLUMNS = {"max_duration": int, "job_level": str, "remote": str, "adaptive": str, "language": str}
+
+
+# --- Catalog vectors and metadata from the published snapshot ---
+def load_catalog_vectors(version_dir: str):
+    from .snapshot import SnapshotIndex, open_snapshot
+
+    snapshot = open_snapshot(version_dir)
+    shards = [snapshot] if isinstance(snapshot, SnapshotIndex) else list(snapshot.shards.values())
+
+    node_ids, vectors, metadata = [], [], []
+    for shard in shards:
+        for i in range(len(shard)):
+            record = shard.record(i)
+            node_ids.append(record["id"])
+            vectors.append(shard.vectors[i])
+            metadata.append(record["metadata"])
+    return node_ids, np.asarray(vectors, dtype=np.float32), metadata
+
+
+def iter_profiles(path: str, batch_size: int = 256):
+    import pandas as pd
+
+    if path.endswith(".jsonl"):
+        batches = pd.read_json(path, lines=True, chunksize=batch_size)
+    else:
+        batches = pd.read_csv(path, chunksize=batch_size)
+    start = 0
+    for batch in batches:
+        if "id" not in batch.columns:
+            batch = batch.assign(id=range(start, start + len(batch)))
+        start += len(batch)
+        yield batch
+
+
+def profile_constraints(row: dict, defaults: dict) -> tuple:
+    constraints = dict(defaults)
+    for name, cast in CONSTRAINT_COLUMNS.items():
+        value = row.get(name)
+        if value is not None and value == value and value != "":
+            constraints[name] = cast(value)
+    return tuple(sorted(constraints.items()))
+
+
+# --- Blocked scoring with a running top-k ---
+def _score_block(queries: np.ndarray, block: np.ndarray, allowed: np.ndarray, start: int, top_k: int):
+    scores = queries @ block.T
+    scores[~allowed] = -np.inf
+    k = min(top_k, block.shape[0])
+    idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return idx + start, np.take_along_axis(scores, idx, axis=1)
+
+
+def score_batch(queries: np.ndarray, vectors: np.ndarray, allowed: np.ndarray, top_k: int, block_size: int, pool):
+    # numpy releases the GIL in the matmul, so blocks run on all cores at once
+    n = vectors.shape[0]
+    futures = [
+        pool.submit(_score_block, queries, vectors[start:start + block_size], allowed[:, start:start + block_size], start, top_k)
+        for start in range(0, n, block_size)
+    ]
+    parts = [future.result() for future in futures]
+    idx = np.concatenate([p[0] for p in parts], axis=1)
+    scores = np.concatenate([p[1] for p in parts], axis=1)
+
+    order = np.argsort(-scores, axis=1)[:, :top_k]
+    return np.take_along_axis(idx, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+def iter_bulk_scores(
+    profiles_path: str,
+    persist_dir: str = PERSIST_DIR,
+    top_k: int = 20,
+    batch_size: int = 256,
+    block_size: int = 2048,
+    workers: Optional[int] = None,
+    filters: Optional[dict] = None,
+):
+    from llama_index.core.settings import Settings
+
+    from .coarse import embed_query_batch
+    from .settings import configure_settings
+    from .snapshot import read_embed_profile
+    from .versions import resolve_persist_dir
+
+    # Vectors and the query model must come from the same version
+    version_dir = resolve_persist_dir(persist_dir)
+    configure_settings(llm=False, profile=read_embed_profile(version_dir))
+    node_ids, vectors, metadata = load_catalog_vectors(version_dir)
+    defaults = {k: v for k, v in (filters or {}).items() if v is not None}
+    masks = {}
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1, thread_name_prefix="shl-bulk") as pool:
+        for batch in iter_profiles(profiles_path, batch_size):
+            rows = batch.to_dict("records")
+            queries = embed_query_batch(Settings.embed_model, [str(row["text"]) for row in rows])
+            queries /= np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+
+            # One catalog mask per distinct set of constraints
+            keys = [profile_constraints(row, defaults) for row in rows]
+            for key in set(keys) - masks.keys():
+                masks[key] = np.fromiter((matches_filters(m, **dict(key)) for m in metadata), dtype=bool, count=len(metadata))
+            allowed = np.stack([masks[key] for key in keys])
+
+            idx, scores = score_batch(queries, vectors, allowed, top_k, block_size, pool)
+            out = []
+            for row, row_idx, row_scores in zip(rows, idx, scores):
+                for rank, (i, score) in enumerate(zip(row_idx, row_scores), start=1):
+                    if score == -np.inf:
+                        break
+                    meta = metadata[i]
+                    out.append({
+                        "profile_id": str(row["id"]),
+                        "rank": rank,
+                        "node_id": node_ids[i],
+                        "assessment_name": meta.get("assessment_name"),
+                        "url": meta.get("url"),
+                        "duration_minutes": meta.get("duration_minutes"),
+                        "score": float(score),
+                    })
+            yield len(rows), out
+
+
+def write_parquet(batches, out_path: str) -> tuple:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Writing Parquet needs `pip install pyarrow`") from e
+
+    schema = pa.schema([
+        ("profile_id", pa.string()),
+        ("rank", pa.int32()),
+        ("node_id", pa.string()),
+        ("assessment_name", pa.string()),
+        ("url", pa.string()),
+        ("duration_minutes", pa.int32()),
+        ("score", pa.float32()),
+    ])
+    profiles = rows = 0
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    with pq.ParquetWriter(tmp_path, schema) as writer:
+        for batch_profiles, batch_rows in batches:
+            writer.write_table(pa.Table.from_pylist(batch_rows, schema=schema))
+            profiles += batch_profiles
+            rows += len(batch_rows)
+    os.replace(tmp_path, out_path)
+    return profiles, rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", required=True)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--persist-dir", default=PERSIST_DIR)
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--block-size", type=int, default=2048)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    for name, cast in CONSTRAINT_COLUMNS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=cast)
+    args = parser.parse_args(argv)
+
+    filters = {name: getattr(args, name) for name in CONSTRAINT_COLUMNS}
+    start = time.perf_counter()
+    batches = iter_bulk_scores(
+        args.profiles, args.persist_dir, args.top_k, args.batch_size, args.block_size, args.workers, filters
+    )
+    profiles, rows = write_parquet(batches, args.out)
+    elapsed = time.perf_counter() - start
+    print(f"📊 Scored {profiles} profiles ({rows} rows) in {elapsed:.1f}s, written to '{args.out}'.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
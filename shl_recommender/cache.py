@@ -0,0 +1,119 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Optional
+
+from .tracing import span
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+class TTLCache:
+    def __init__(self, ttl_seconds: float = 3600, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def response_cache_key(query: str, node_ids, model_name: str) -> str:
+    payload = json.dumps([normalize_query(query), list(node_ids), model_name])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# One process-wide cache, shared by every query engine built in the process
+@lru_cache(maxsize=None)
+def default_response_cache(ttl_seconds: float = 3600, max_entries: int = 1024) -> TTLCache:
+    return TTLCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
+
+
+# Retrieve as usual, but skip LLM synthesis when the same query already
+# produced an answer from the same retrieved nodes with the same model.
+# Queries matching a precomputed template skip the pipeline entirely.
+# Each stage runs in its own tracing span.
+class CachedQueryEngine:
+    def __init__(self, query_engine, cache: Optional[TTLCache], model_name: str, embed_model=None, templates=None):
+        self._query_engine = query_engine
+        self._cache = cache
+        self._model_name = model_name
+        self._embed_model = embed_model
+        self._templates = templates
+
+    def retrieve(self, query_bundle):
+        return self._query_engine.retrieve(query_bundle)
+
+    def lookup_template(self, query_bundle):
+        if self._templates is None:
+            return None
+        with span("template_cache"):
+            return self._templates.lookup(query_bundle.query_str, query_bundle.embedding)
+
+    def synthesize(self, query_bundle, nodes):
+        from llama_index.core.base.response.schema import Response
+
+        key = None
+        if self._cache is not None:
+            key = response_cache_key(query_bundle.query_str, [n.node.node_id for n in nodes], self._model_name)
+            cached = self._cache.get(key)
+            if cached is not None:
+                return Response(response=cached, source_nodes=nodes, metadata={"cache_hit": True})
+
+        with span("llm_synthesis"):
+            response = self._query_engine.synthesize(query_bundle, nodes)
+        if key is not None and response.response:
+            self._cache.set(key, response.response)
+        return response
+
+    def query(self, query):
+        from llama_index.core.schema import QueryBundle
+
+        from .coarse import embed_query_bundle
+
+        query_bundle = query if isinstance(query, QueryBundle) else QueryBundle(query)
+        hit = self.lookup_template(query_bundle)
+        if hit is not None:
+            return hit
+
+        with span("embed_query"):
+            query_bundle = embed_query_bundle(query_bundle, self._embed_model)
+        # Near-duplicate template match; chunked long postings have no single embedding
+        if query_bundle.embedding is not None:
+            hit = self.lookup_template(query_bundle)
+            if hit is not None:
+                return hit
+
+        with span("vector_search"):
+            nodes = self._query_engine.retrieve(query_bundle)
+        return self.synthesize(query_bundle, nodes)
@@ -0,0 +1,194 @@
+"""Canonical catalog: every scraped CSV merged into one typed Parquet dataset.
+
+Usage: python -m shl_recommender.catalog [--out catalog.parquet] [--sources rex.csv final.csv ...]
+
+One row per assessment URL, with columns:
+    id                uuid5 of the URL, stable across scrapes and rebuilds
+    url, assessment_name, description
+    remote, adaptive  bool
+    types             list of full type names (single-letter codes expanded)
+    job_levels        list
+    languages         list
+    duration_minutes  int; 9999 = untimed, -1 = variable or unknown
+
+Sources are merged by URL in priority order: a field is taken from the first
+source that has a non-empty value for it.
+"""
+import argparse
+import os
+import re
+import sys
+import uuid
+from typing import Iterable, Optional, Sequence
+
+from .settings import CATALOG_PATH, CATALOG_SOURCES
+
+UNTIMED = 9999
+VARIABLE = -1
+# What the scraper writes when a field is absent from the product page
+MISSING = "Not Found"
+TYPE_CODES = {
+    "A": "Ability & Aptitude",
+    "B": "Biodata & Situational Judgement",
+    "C": "Competencies",
+    "D": "Development & 360",
+    "E": "Assessment Exercises",
+    "K": "Knowledge & Skills",
+    "P": "Personality & Behavior",
+    "S": "Simulations",
+}
+LIST_COLUMNS = ["types", "job_levels", "languages"]
+CANONICAL_COLUMNS = [
+    "id", "url", "assessment_name", "description", "remote", "adaptive",
+    "types", "job_levels", "languages", "duration_minutes",
+]
+
+
+def catalog_id(url: str) -> str:
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, url))
+
+
+def parse_duration(text) -> int:
+    # "Approximate Completion Time in minutes = 49" / "max 30" / "15 to 35" / "Untimed"
+    if not isinstance(text, str):
+        return VARIABLE
+    value = text.split("=", 1)[-1]
+    if "untimed" in value.lower():
+        return UNTIMED
+    numbers = [int(n) for n in re.findall(r"\d+", value)]
+    # Ranges keep the upper bound so max-duration filters stay conservative
+    return max(numbers) if numbers else VARIABLE
+
+
+def _split_list(series):
+    return series.fillna("").astype(str).map(
+        lambda value: list(dict.fromkeys(
+            item.strip() for item in re.split(r"[,\n]", value) if item.strip() and item.strip() != MISSING
+        ))
+    )
+
+
+def _expand_types(types):
+    return list(dict.fromkeys(TYPE_CODES.get(t, t) for t in types))
+
+
+# --- Parse one scraped CSV frame into canonical columns ---
+def canonical_frame(df):
+    import pandas as pd
+
+    def column(name):
+        return df[name] if name in df.columns else pd.Series([None] * len(df), index=df.index)
+
+    out = pd.DataFrame({
+        "url": column("URL").astype(str).str.strip(),
+        "assessment_name": column("Assessment Name").astype(str).str.strip(),
+        "description": column("Description").fillna("").astype(str).str.strip(),
+        "remote": column("Remote Support").astype(str).str.strip().str.lower().eq("yes"),
+        "adaptive": column("Adaptive Support").astype(str).str.strip().str.lower().eq("yes"),
+        "types": _split_list(column("Types")).map(_expand_types),
+        "job_levels": _split_list(column("Job Levels")),
+        "languages": _split_list(column("Languages")),
+    })
+    if "Assessment Length" in df.columns:
+        out["duration_minutes"] = df["Assessment Length"].map(parse_duration).astype("int64")
+    else:
+        out["duration_minutes"] = pd.to_numeric(column("Assessment Length (minutes)"), errors="coerce").fillna(VARIABLE).astype("int64")
+    out.insert(0, "id", out["url"].map(catalog_id))
+    return out[CANONICAL_COLUMNS]
+
+
+def is_canonical(df) -> bool:
+    return set(CANONICAL_COLUMNS) <= set(df.columns)
+
+
+def merge_sources(sources: Sequence[str]):
+    import pandas as pd
+
+    merged = None
+    for path in sources:
+        frame = canonical_frame(pd.read_csv(path)).drop_duplicates("id").set_index("id")
+        # Missing fields are NaN / empty lists; let lower-priority sources fill them
+        frame["description"] = frame["description"].replace("", None)
+        for name in LIST_COLUMNS:
+            frame[name] = frame[name].map(lambda items: items or None)
+        frame.loc[frame["duration_minutes"] == VARIABLE, "duration_minutes"] = None
+        merged = frame if merged is None else merged.combine_first(frame)
+
+    merged["description"] = merged["description"].fillna("")
+    for name in LIST_COLUMNS:
+        merged[name] = merged[name].map(lambda items: items if isinstance(items, list) else [])
+    merged["duration_minutes"] = merged["duration_minutes"].fillna(VARIABLE).astype("int64")
+    merged["remote"] = merged["remote"].astype(bool)
+    merged["adaptive"] = merged["adaptive"].astype(bool)
+    return merged.reset_index()[CANONICAL_COLUMNS].sort_values("url", kind="stable").reset_index(drop=True)
+
+
+def build_catalog(sources: Sequence[str] = CATALOG_SOURCES, out_path: str = CATALOG_PATH) -> str:
+    frame = merge_sources([path for path in sources if os.path.exists(path)])
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    frame.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def ensure_catalog(out_path: str = CATALOG_PATH, sources: Sequence[str] = CATALOG_SOURCES) -> str:
+    # Rebuilt only when a source CSV is newer than the dataset
+    existing = [path for path in sources if os.path.exists(path)]
+    if os.path.exists(out_path) and all(os.path.getmtime(p) <= os.path.getmtime(out_path) for p in existing):
+        return out_path
+    print(f"🧹 Normalizing {len(existing)} catalog sources into '{out_path}'.")
+    return build_catalog(existing, out_path)
+
+
+def load_catalog(path: str = CATALOG_PATH):
+    import pandas as pd
+
+    return _restore_lists(pd.read_parquet(path))
+
+
+def _restore_lists(frame):
+    # Parquet list columns come back as numpy arrays
+    for name in LIST_COLUMNS:
+        frame[name] = frame[name].map(list)
+    return frame
+
+
+def iter_catalog_frames(path: str, chunksize: Optional[int] = None, skip_rows: int = 0) -> Iterable:
+    import pandas as pd
+
+    if path.endswith(".parquet") and not chunksize:
+        frame = load_catalog(path).iloc[skip_rows:]
+        if len(frame):
+            yield frame
+        return
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        # Read batch by batch; rows before skip_rows are skipped without being converted
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            if skip_rows >= batch.num_rows:
+                skip_rows -= batch.num_rows
+                continue
+            yield _restore_lists(batch.slice(skip_rows).to_pandas())
+            skip_rows = 0
+        return
+    if chunksize:
+        yield from pd.read_csv(path, chunksize=chunksize, skiprows=range(1, skip_rows + 1))
+    else:
+        yield pd.read_csv(path, skiprows=range(1, skip_rows + 1))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default=CATALOG_PATH)
+    parser.add_argument("--sources", nargs="+", default=list(CATALOG_SOURCES))
+    args = parser.parse_args(argv)
+
+    path = build_catalog(args.sources, args.out)
+    frame = load_catalog(path)
+    print(f"📚 Canonical catalog with {len(frame)} assessments written to '{path}'.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+import os
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import NodeWithScore, QueryBundle
+from llama_index.core.settings import Settings
+
+from .jd import fuse_chunk_scores, split_job_description
+
+PROJECTION_FILE = "projection.npz"
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+# --- Fit a reduced-dimension projection over the catalog embeddings ---
+# PCA from the mean and the dim x dim scatter matrix, accumulated one batch at
+# a time: the top eigenvectors of the covariance are the leading right
+# singular vectors, without an (n, dim) copy of the catalog in memory
+class ProjectionFitter:
+    def __init__(self, dims: int = 128, method: str = "pca"):
+        if method not in ("pca", "prefix"):
+            raise ValueError(f"Unknown projection method: {method}")
+        self.dims = dims
+        self.method = method
+        self.count = 0
+        self.total = None
+        self.scatter = None
+
+    def update(self, embeddings: np.ndarray):
+        embeddings = np.asarray(embeddings, dtype=np.float64)
+        if self.total is None:
+            self.total = np.zeros(embeddings.shape[1])
+            self.scatter = np.zeros((embeddings.shape[1], embeddings.shape[1])) if self.method == "pca" else None
+        self.count += len(embeddings)
+        self.total += embeddings.sum(axis=0)
+        if self.scatter is not None:
+            self.scatter += embeddings.T @ embeddings
+
+    def fit(self):
+        dim = len(self.total)
+        dims = min(self.dims, dim)
+        if self.method == "prefix":
+            # Matryoshka-style: keep the leading dims as-is
+            return np.zeros(dim, dtype=np.float32), np.eye(dim, dtype=np.float32)[:dims]
+        mean = self.total / max(self.count, 1)
+        covariance = self.scatter - self.count * np.outer(mean, mean)
+        _, vectors = np.linalg.eigh(covariance)
+        components = vectors[:, ::-1][:, :dims].T
+        return mean.astype(np.float32), components.astype(np.float32)
+
+
+def fit_projection(embeddings: np.ndarray, dims: int = 128, method: str = "pca"):
+    fitter = ProjectionFitter(dims, method)
+    fitter.update(embeddings)
+    return fitter.fit()
+
+
+def project(vectors: np.ndarray, mean: np.ndarray, components: np.ndarray) -> np.ndarray:
+    return _normalize((vectors - mean) @ components.T).astype(np.float32)
+
+
+def build_projection(index, persist_dir: str, dims: int = 128, method: str = "pca") -> str:
+    embedding_dict = index.vector_store.data.embedding_dict
+    node_ids = list(embedding_dict.keys())
+    embeddings = np.asarray([embedding_dict[i] for i in node_ids], dtype=np.float32)
+    return build_projection_from_arrays(node_ids, embeddings, persist_dir, dims=dims, method=method)
+
+
+def build_projection_from_arrays(node_ids, embeddings: np.ndarray, persist_dir: str, dims: int = 128, method: str = "pca") -> str:
+    full = _normalize(np.asarray(embeddings, dtype=np.float32))
+    mean, components = fit_projection(full, dims=dims, method=method)
+    return save_projection(persist_dir, node_ids, full, mean, components, method=method)
+
+
+def save_projection(persist_dir: str, node_ids, full: np.ndarray, mean, components, method: str = "pca", batch_size: int = 4096) -> str:
+    # full may be memory-mapped: it is reduced through a scratch file next to the
+    # archive, and np.savez copies both into it in bounded chunks
+    scratch_path = os.path.join(persist_dir, ".reduced.npy")
+    reduced = np.lib.format.open_memmap(scratch_path, mode="w+", dtype=np.float32, shape=(len(full), len(components)))
+    for start in range(0, len(full), batch_size):
+        reduced[start:start + batch_size] = project(full[start:start + batch_size], mean, components)
+
+    path = os.path.join(persist_dir, PROJECTION_FILE)
+    try:
+        np.savez(
+            path,
+            node_ids=np.asarray(node_ids),
+            full=full,
+            reduced=reduced,
+            mean=mean,
+            components=components,
+            method=np.asarray(method),
+        )
+    finally:
+        del reduced
+        os.remove(scratch_path)
+    return path
+
+
+def load_projection(version_dir: str) -> Optional[dict]:
+    path = os.path.join(version_dir, PROJECTION_FILE)
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        return {key: data[key] for key in data.files}
+
+
+# --- Coarse pass on the projection, rerank the shortlist at full dimension ---
+def two_stage_search(query_embedding, projection: dict, top_k: int = 10, shortlist: int = 100):
+    query = _normalize(np.asarray(query_embedding, dtype=np.float32))
+    reduced = projection["reduced"]
+    n = reduced.shape[0]
+    if n == 0:
+        return []
+
+    coarse_scores = reduced @ project(query, projection["mean"], projection["components"])
+    shortlist = min(max(shortlist, top_k), n)
+    if shortlist < n:
+        candidates = np.argpartition(-coarse_scores, shortlist - 1)[:shortlist]
+    else:
+        candidates = np.arange(n)
+
+    fine_scores = projection["full"][candidates] @ query
+    order = np.argsort(-fine_scores)[:top_k]
+    node_ids = projection["node_ids"]
+    return [(str(node_ids[candidates[i]]), float(fine_scores[i])) for i in order]
+
+
+class TwoStageRetriever(BaseRetriever):
+    def __init__(self, index, projection: dict, similarity_top_k: int = 10, shortlist: int = 100, embed_model=None):
+        self._index = index
+        self._projection = projection
+        self._top_k = similarity_top_k
+        self._shortlist = shortlist
+        self._embed_model = embed_model or Settings.embed_model
+        super().__init__()
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        query_embedding = query_bundle.embedding
+        if query_embedding is None:
+            query_embedding = self._embed_model.get_query_embedding(query_bundle.query_str)
+
+        hits = two_stage_search(query_embedding, self._projection, top_k=self._top_k, shortlist=self._shortlist)
+        return [
+            NodeWithScore(node=self._index.docstore.get_node(node_id), score=score)
+            for node_id, score in hits
+        ]
+
+
+# --- Long job descriptions: one query vector per chunk, fused per assessment ---
+@dataclass
+class ChunkedQueryBundle(QueryBundle):
+    chunk_embeddings: Optional[np.ndarray] = None
+
+
+def embed_query_batch(embed_model, texts: List[str]) -> np.ndarray:
+    # FastEmbed takes the whole list as one ONNX batch
+    model = getattr(embed_model, "_model", None)
+    if hasattr(model, "query_embed"):
+        return np.asarray(list(model.query_embed(texts)), dtype=np.float32)
+    return np.asarray([embed_model.get_query_embedding(t) for t in texts], dtype=np.float32)
+
+
+def embed_query_bundle(query_bundle: QueryBundle, embed_model) -> QueryBundle:
+    # Bundles that already carry embeddings pass through untouched
+    if embed_model is None or query_bundle.embedding is not None or getattr(query_bundle, "chunk_embeddings", None) is not None:
+        return query_bundle
+    chunks = split_job_description(query_bundle.query_str)
+    if len(chunks) > 1:
+        # Long posting: boilerplate stripped, one embedding per skill-focused chunk
+        chunked = ChunkedQueryBundle("\n\n".join(chunks), custom_embedding_strs=chunks)
+        chunked.chunk_embeddings = embed_query_batch(embed_model, chunks)
+        return chunked
+    query_bundle.embedding = embed_model.get_query_embedding(query_bundle.query_str)
+    return query_bundle
+
+
+def multi_vector_search(query_embeddings, projection: dict, top_k: int = 10, fusion: str = "max"):
+    queries = _normalize(np.asarray(query_embeddings, dtype=np.float32))
+    full = projection["full"]
+    if full.shape[0] == 0:
+        return []
+    # One (n, chunks) matmul scores every chunk against the whole catalog
+    scores = fuse_chunk_scores(full @ queries.T, fusion)
+    k = min(top_k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    node_ids = projection["node_ids"]
+    return [(str(node_ids[i]), float(scores[i])) for i in top]
+
+
+class MultiVectorRetriever(BaseRetriever):
+    def __init__(self, base_retriever, index, projection: Optional[dict], similarity_top_k: int = 10, fusion: str = "max"):
+        self._base = base_retriever
+        self._index = index
+        self._projection = projection
+        self._top_k = similarity_top_k
+        self._fusion = fusion
+        super().__init__()
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        chunk_embeddings = getattr(query_bundle, "chunk_embeddings", None)
+        if chunk_embeddings is None or len(chunk_embeddings) < 2:
+            return self._base.retrieve(query_bundle)
+        if self._projection is None:
+            # Legacy index without full vectors on disk: search once with the centroid
+            query_bundle.embedding = _normalize(np.mean(_normalize(chunk_embeddings), axis=0)).tolist()
+            return self._base.retrieve(query_bundle)
+
+        hits = multi_vector_search(chunk_embeddings, self._projection, top_k=self._top_k, fusion=self._fusion)
+        return [
+            NodeWithScore(node=self._index.docstore.get_node(node_id), score=score)
+            for node_id, score in hits
+        ]
@@ -0,0 +1,103 @@
+from typing import List, Optional
+
+from llama_index.core.postprocessor.types import BaseNodePostprocessor
+from llama_index.core.response_synthesizers import CompactAndRefine
+from llama_index.core.schema import NodeWithScore, QueryBundle, TextNode
+
+from .ingestion import format_duration
+
+# Fields the recommendation prompt actually uses; the URL is left to the results table
+PROMPT_FIELDS = [
+    ("Assessment", "assessment_name"),
+    ("Type", "type"),
+    ("Duration", "duration_minutes"),
+    ("Remote", "remote"),
+    ("Adaptive", "adaptive"),
+    ("Job Levels", "job_levels"),
+]
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token is close enough for budgeting English text
+    return len(text) // 4 + 1
+
+
+def _description_from_text(text: str) -> str:
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("Description:"):
+            return line[len("Description:"):].strip()
+    return ""
+
+
+def pack_node_text(node, max_description_tokens: int = 120) -> str:
+    lines = []
+    for label, key in PROMPT_FIELDS:
+        value = node.metadata.get(key, "")
+        if key == "duration_minutes":
+            value = format_duration(value if value != "" else -1)
+        lines.append(f"{label}: {value}")
+
+    description = _description_from_text(node.get_content())
+    max_chars = max_description_tokens * 4
+    if len(description) > max_chars:
+        description = description[:max_chars].rsplit(" ", 1)[0] + "…"
+    if description:
+        lines.insert(1, f"Description: {description}")
+    return "\n".join(lines)
+
+
+# Trim retrieved nodes to the prompt fields and stop adding nodes once the
+# token budget is spent, so CompactAndRefine fits everything in one LLM call
+class ContextPacker(BaseNodePostprocessor):
+    token_budget: int = 2500
+    max_description_tokens: int = 120
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "ContextPacker"
+
+    def _postprocess_nodes(
+        self,
+        nodes: List[NodeWithScore],
+        query_bundle: Optional[QueryBundle] = None,
+    ) -> List[NodeWithScore]:
+        packed, used = [], 0
+        for item in nodes:
+            text = pack_node_text(item.node, self.max_description_tokens)
+            cost = estimate_tokens(text)
+            if packed and used + cost > self.token_budget:
+                break
+            used += cost
+
+            node = TextNode(
+                id_=item.node.node_id,
+                text=text,
+                metadata=item.node.metadata,
+                # Everything the LLM needs is already in the packed text
+                excluded_llm_metadata_keys=list(item.node.metadata),
+            )
+            packed.append(NodeWithScore(node=node, score=item.score))
+        return packed
+
+
+# Packs only the synthesizer's copy of the context: the LLM reads the trimmed
+# texts, while response.source_nodes keep the retrieved nodes (URL included)
+class PackedCompactAndRefine(CompactAndRefine):
+    def __init__(self, packer: ContextPacker, **kwargs):
+        super().__init__(**kwargs)
+        self._packer = packer
+
+    def _pack(self, query, nodes: List[NodeWithScore]) -> List[NodeWithScore]:
+        query_bundle = QueryBundle(query) if isinstance(query, str) else query
+        return self._packer.postprocess_nodes(nodes, query_bundle=query_bundle)
+
+    def synthesize(self, query, nodes, additional_source_nodes=None, **response_kwargs):
+        response = super().synthesize(query, self._pack(query, nodes), additional_source_nodes, **response_kwargs)
+        response.source_nodes = list(nodes) + list(additional_source_nodes or [])
+        return response
+
+    async def asynthesize(self, query, nodes, additional_source_nodes=None, **response_kwargs):
+        response = await super().asynthesize(query, self._pack(query, nodes), additional_source_nodes, **response_kwargs)
+        response.source_nodes = list(nodes) + list(additional_source_nodes or [])
+        return response
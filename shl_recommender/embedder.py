@@ -0,0 +1,79 @@
+"""Dedicated embedding process shared by serving workers.
+
+Usage: SHL_EMBEDDER_AUTHKEY=<secret> python -m shl_recommender.embedder --socket /run/shl-embedder.sock
+       [--profile bge-small]
+"""
+import argparse
+import os
+import sys
+import threading
+from multiprocessing.connection import Client, Listener
+
+from typing import Optional
+
+
+# --- One process owns the ONNX session; workers call it over a Unix socket ---
+def run_embedder_server(socket_path: str, authkey: bytes, profile: Optional[str] = None):
+    import numpy as np
+
+    from .coarse import embed_query_batch
+    from .settings import get_embed_model
+
+    embed_model = get_embed_model(profile)
+    lock = threading.Lock()
+
+    def handle(conn):
+        with conn:
+            while True:
+                try:
+                    kind, texts = conn.recv()
+                except EOFError:
+                    return
+                with lock:
+                    if kind == "query":
+                        vectors = embed_query_batch(embed_model, texts)
+                    else:
+                        vectors = embed_model.get_text_embedding_batch(texts)
+                conn.send(np.asarray(vectors, dtype=np.float32))
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    with Listener(socket_path, family="AF_UNIX", authkey=authkey) as listener:
+        while True:
+            conn = listener.accept()
+            threading.Thread(target=handle, args=(conn,), daemon=True).start()
+
+
+class EmbedderClient:
+    def __init__(self, socket_path: str, authkey: bytes):
+        self.socket_path = socket_path
+        self.authkey = authkey
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = Client(self.socket_path, family="AF_UNIX", authkey=self.authkey)
+        return conn
+
+    def embed(self, texts, kind: str = "text"):
+        conn = self._conn()
+        conn.send((kind, list(texts)))
+        return conn.recv()
+
+    def get_query_embedding(self, query: str):
+        return self.embed([query], kind="query")[0]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--socket", required=True)
+    parser.add_argument("--profile", help="Embedding profile (default: SHL_EMBED_PROFILE); must match the index")
+    args = parser.parse_args(argv)
+
+    run_embedder_server(args.socket, os.environ["SHL_EMBEDDER_AUTHKEY"].encode("utf-8"), args.profile)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""Embedding profiles, and a side-by-side comparison of them on the labeled queries.
+
+Usage: python -m shl_recommender.embeddings [--profiles minilm,bge-small,bge-base,bge-large]
+       [--queries benchmarks/queries.jsonl] [--catalog catalog.parquet] [--k 10] [--repeat 3]
+       [--min-recall 0.6] [--output results.json]
+
+SHL_EMBED_PROFILE picks the profile new indexes are built with (default
+bge-large). The profile is recorded in the published manifest, and an index is
+always queried with the profile it was built with. The -int8 profiles run a
+dynamically quantized copy of FastEmbed's fp32 ONNX export, written once next
+to it in the FastEmbed cache (needs `pip install onnx`).
+
+Each profile runs in its own subprocess: the whole catalog is embedded (encode
+throughput), then every labeled query is embedded (query latency) and searched
+by exact cosine with its filters applied (recall@k, MAP@k). The report ends
+with the fastest profile whose recall@k reaches --min-recall (default: the best
+recall measured).
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import sys
+import time
+
+from .benchmark import average_precision_at_k, format_table, load_queries, percentile, recall_at_k, run_isolated
+from .settings import CATALOG_PATH, EMBED_PROFILES, get_embed_model
+
+DEFAULT_COMPARE = ["minilm", "bge-small", "bge-base", "bge-large"]
+
+
+# --- Build the FastEmbed model behind a profile ---
+def quantized_model_dir(model_name: str) -> str:
+    from fastembed import TextEmbedding
+
+    try:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+    except ImportError as e:
+        raise ImportError("The -int8 embedding profiles need `pip install onnx onnxruntime`") from e
+
+    # lazy_load downloads the export without creating an inference session. The
+    # export's directory (_model_dir) is not public API, hence the fastembed pin
+    source = TextEmbedding(model_name=model_name, lazy_load=True).model
+    model_file = source.model_description.model_file
+    out_dir = f"{source._model_dir}-int8"
+    if os.path.exists(os.path.join(out_dir, model_file)):
+        return out_dir
+
+    print(f"🗜️ Quantizing '{model_name}' to int8 in '{out_dir}'.")
+    tmp_dir = f"{out_dir}.{os.getpid()}.tmp"
+    # Tokenizer and config files are copied as they are; only the graph is rewritten
+    shutil.copytree(source._model_dir, tmp_dir, ignore=shutil.ignore_patterns("*.onnx", "*.onnx_data"))
+    os.makedirs(os.path.dirname(os.path.join(tmp_dir, model_file)), exist_ok=True)
+    quantize_dynamic(
+        os.path.join(source._model_dir, model_file), os.path.join(tmp_dir, model_file), weight_type=QuantType.QInt8
+    )
+    try:
+        os.replace(tmp_dir, out_dir)
+    except OSError:
+        # Another process finished the same model first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return out_dir
+
+
+def build_embed_model(profile: str):
+    from llama_index.embeddings.fastembed import FastEmbedEmbedding
+
+    # Any other FastEmbed model name works as a profile of its own
+    spec = EMBED_PROFILES.get(profile, {"model": profile, "quantize": False})
+    if not spec["quantize"]:
+        return FastEmbedEmbedding(model_name=spec["model"])
+    return FastEmbedEmbedding(model_name=spec["model"], specific_model_path=quantized_model_dir(spec["model"]))
+
+
+# --- Compare one profile in this process ---
+def run_profile(profile: str, queries, catalog_path: str = CATALOG_PATH, k: int = 10, repeat: int = 3) -> dict:
+    import numpy as np
+    from llama_index.core.schema import MetadataMode
+
+    from .catalog import ensure_catalog, iter_catalog_frames
+    from .filters import matches_filters
+    from .ingestion import nodes_from_frame
+
+    if catalog_path.endswith(".parquet"):
+        ensure_catalog(catalog_path)
+    nodes = [node for frame in iter_catalog_frames(catalog_path) for node in nodes_from_frame(frame)]
+
+    started = time.perf_counter()
+    embed_model = get_embed_model(profile)
+    load_s = time.perf_counter() - started
+
+    # Same text the ingestion pipeline embeds
+    texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes]
+    started = time.perf_counter()
+    vectors = np.asarray(embed_model.get_text_embedding_batch(texts), dtype=np.float32)
+    encode_s = time.perf_counter() - started
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    embed_model.get_query_embedding(queries[0]["query"])  # warm-up
+    latencies, recalls, aps = [], [], []
+    for i in range(repeat):
+        for q in queries:
+            t0 = time.perf_counter()
+            query = np.asarray(embed_model.get_query_embedding(q["query"]), dtype=np.float32)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if i:
+                continue
+            allowed = np.fromiter(
+                (matches_filters(node.metadata, **q.get("filters", {})) for node in nodes), dtype=bool, count=len(nodes)
+            )
+            scores = np.where(allowed, vectors @ query, -np.inf)
+            retrieved = [nodes[j].metadata.get("url", "") for j in np.argsort(-scores)[:k] if allowed[j]]
+            recalls.append(recall_at_k(retrieved, q["relevant_urls"], k))
+            aps.append(average_precision_at_k(retrieved, q["relevant_urls"], k))
+
+    return {
+        "profile": profile,
+        "model": EMBED_PROFILES.get(profile, {"model": profile})["model"],
+        "dim": int(vectors.shape[1]),
+        "load_s": load_s,
+        "encode_docs_per_s": len(texts) / encode_s if encode_s else 0.0,
+        "query_p50_ms": percentile(latencies, 50),
+        "query_p95_ms": percentile(latencies, 95),
+        # ru_maxrss is reported in KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        f"recall@{k}": sum(recalls) / len(recalls),
+        f"map@{k}": sum(aps) / len(aps),
+    }
+
+
+def cheapest_profile(results, k: int, min_recall=None):
+    # Fastest query embedding among the profiles that meet the relevance bar
+    measured = [r for r in results if "error" not in r]
+    if not measured:
+        return None
+    if min_recall is None:
+        min_recall = max(r[f"recall@{k}"] for r in measured)
+    passing = [r for r in measured if r[f"recall@{k}"] >= min_recall]
+    return min(passing, key=lambda r: r["query_p50_ms"]) if passing else None
+
+
+def format_results(results, k: int) -> str:
+    return format_table(
+        results,
+        ["profile", "dim", "load_s", "encode_docs_per_s", "query_p50_ms", "query_p95_ms", "peak_rss_mb",
+         f"recall@{k}", f"map@{k}"],
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", default=",".join(DEFAULT_COMPARE))
+    parser.add_argument("--queries", default="benchmarks/queries.jsonl")
+    parser.add_argument("--catalog", default=CATALOG_PATH)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-recall", type=float, help="Relevance bar for the recommendation")
+    parser.add_argument("--output", help="Write the raw results as JSON to this path")
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    queries = load_queries(args.queries)
+    if args.single:
+        print(json.dumps(run_profile(args.single, queries, args.catalog, args.k, args.repeat)))
+        return 0
+
+    results = []
+    for profile in args.profiles.split(","):
+        print(f"⏱️ Comparing embedding profile {profile}...", file=sys.stderr)
+        flags = ["--queries", args.queries, "--catalog", args.catalog, "--k", str(args.k), "--repeat", str(args.repeat)]
+        results.append(run_isolated("shl_recommender.embeddings", "profile", profile, flags))
+
+    print(format_results(results, args.k))
+    best = cheapest_profile(results, args.k, args.min_recall)
+    if best is not None:
+        print(f"\n🏁 Cheapest profile meeting the bar: {best['profile']} (SHL_EMBED_PROFILE={best['profile']})")
+    else:
+        print("\n⚠️ No profile meets the relevance bar.")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0 if all("error" not in r for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
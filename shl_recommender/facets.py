@@ -0,0 +1,132 @@
+import os
+from typing import List, Optional
+
+import numpy as np
+
+from .cache import TTLCache, normalize_query
+from .tracing import span
+
+# Upper bounds (minutes) of the duration facet buckets
+DURATION_BUCKETS = [15, 30, 45, 60]
+DURATION_LABELS = ["≤15 min", "16-30 min", "31-45 min", "46-60 min", ">60 min"]
+
+
+def _multi_hot(values: List[str]):
+    rows = [[item.strip() for item in str(value).split(",") if item.strip()] for value in values]
+    labels = sorted({item for row in rows for item in row})
+    column = {label: i for i, label in enumerate(labels)}
+    matrix = np.zeros((len(rows), len(labels)), dtype=bool)
+    for i, row in enumerate(rows):
+        matrix[i, [column[item] for item in row]] = True
+    return labels, matrix
+
+
+def _value_counts(values: np.ndarray) -> dict:
+    labels, counts = np.unique(values, return_counts=True)
+    return {str(label): int(count) for label, count in zip(labels, counts)}
+
+
+# A wide candidate list for one query, held as column arrays so that
+# re-filtering, paging and facet counts never go back to the index
+class CandidateSet:
+    def __init__(self, nodes):
+        self.nodes = list(nodes)
+        metadata = [n.node.metadata for n in self.nodes]
+        self.scores = np.asarray([n.score or 0.0 for n in self.nodes], dtype=np.float32)
+        self.duration = np.asarray([m.get("duration_minutes", -1) for m in metadata], dtype=np.int64)
+        self.remote = np.asarray([m.get("remote", "") for m in metadata], dtype=object)
+        self.adaptive = np.asarray([m.get("adaptive", "") for m in metadata], dtype=object)
+        self.type_labels, self.types = _multi_hot([m.get("type", "") for m in metadata])
+        self.level_labels, self.levels = _multi_hot([m.get("job_levels", "") for m in metadata])
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def mask(
+        self,
+        max_duration: Optional[int] = None,
+        remote: Optional[str] = None,
+        adaptive: Optional[str] = None,
+        types: Optional[List[str]] = None,
+        job_level: Optional[str] = None,
+    ) -> np.ndarray:
+        # Same semantics as matches_filters; a list of types matches any of them
+        keep = np.ones(len(self), dtype=bool)
+        if max_duration is not None:
+            keep &= self.duration <= max_duration
+        if remote is not None:
+            keep &= self.remote == remote
+        if adaptive is not None:
+            keep &= self.adaptive == adaptive
+        if types:
+            columns = [i for i, label in enumerate(self.type_labels) if label in types]
+            keep &= self.types[:, columns].any(axis=1)
+        if job_level is not None:
+            columns = [i for i, label in enumerate(self.level_labels) if job_level.lower() in label.lower()]
+            keep &= self.levels[:, columns].any(axis=1)
+        return keep
+
+    def facets(self, mask: Optional[np.ndarray] = None) -> dict:
+        if mask is None:
+            mask = np.ones(len(self), dtype=bool)
+        duration = self.duration[mask]
+        timed = duration[(duration >= 0) & (duration != 9999)]
+        buckets = np.bincount(np.searchsorted(DURATION_BUCKETS, timed, side="left"), minlength=len(DURATION_LABELS))
+        durations = {label: int(count) for label, count in zip(DURATION_LABELS, buckets)}
+        durations["Untimed"] = int((duration == 9999).sum())
+        durations["Variable"] = int((duration == -1).sum())
+        return {
+            "remote": _value_counts(self.remote[mask]),
+            "adaptive": _value_counts(self.adaptive[mask]),
+            "type": {label: int(count) for label, count in zip(self.type_labels, self.types[mask].sum(axis=0)) if count},
+            "duration": {label: count for label, count in durations.items() if count},
+        }
+
+    def page(self, page: int = 1, page_size: int = 10, **filters) -> dict:
+        with span("facet_page"):
+            mask = self.mask(**filters)
+            matches = np.flatnonzero(mask)
+            start = (max(page, 1) - 1) * page_size
+            return {
+                "results": [self.nodes[i] for i in matches[start:start + page_size]],
+                "total": int(len(matches)),
+                "page": max(page, 1),
+                "pages": max(-(-len(matches) // page_size), 1),
+                "facets": self.facets(mask),
+            }
+
+
+# Retrieves the top candidate_k once per query; refinements are served from
+# the cached CandidateSet; one instance serves one index version
+class FacetedSearch:
+    def __init__(self, index, candidate_k: int = 200, embed_model=None, cache_size: int = 64):
+        from llama_index.core.settings import Settings
+
+        from .query import build_retriever
+
+        self.candidate_k = candidate_k
+        self._retriever = build_retriever(index, similarity_top_k=candidate_k)
+        self._embed_model = embed_model or Settings.embed_model
+        ttl = float(os.getenv("SHL_FACET_CACHE_TTL", "900"))
+        self._cache = TTLCache(ttl_seconds=ttl, max_entries=cache_size)
+
+    def candidates(self, query) -> CandidateSet:
+        from llama_index.core.schema import QueryBundle
+
+        from .coarse import embed_query_bundle
+
+        query_bundle = query if isinstance(query, QueryBundle) else QueryBundle(query)
+        key = normalize_query(query_bundle.query_str)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        with span("embed_query"):
+            query_bundle = embed_query_bundle(query_bundle, self._embed_model)
+        with span("candidate_search"):
+            candidates = CandidateSet(self._retriever.retrieve(query_bundle))
+        self._cache.set(key, candidates)
+        return candidates
+
+    def search(self, query, page: int = 1, page_size: int = 10, **filters) -> dict:
+        return self.candidates(query).page(page, page_size, **filters)
@@ -0,0 +1,24 @@
+from typing import Optional
+
+
+# --- Metadata constraints shared by hybrid search, benchmarks and batch jobs ---
+def matches_filters(
+    metadata: dict,
+    max_duration: Optional[int] = None,
+    job_level: Optional[str] = None,
+    remote: Optional[str] = None,
+    adaptive: Optional[str] = None,
+    language: Optional[str] = None,
+) -> bool:
+    # Untimed (9999) counts as too long; Variable (-1) is let through
+    if max_duration is not None and metadata.get("duration_minutes", 9999) > max_duration:
+        return False
+    if job_level is not None and job_level.lower() not in str(metadata.get("job_levels", "")).lower():
+        return False
+    if remote is not None and metadata.get("remote") != remote:
+        return False
+    if adaptive is not None and metadata.get("adaptive") != adaptive:
+        return False
+    if language is not None and language.lower() not in str(metadata.get("languages", "")).lower():
+        return False
+    return True
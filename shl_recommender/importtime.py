@@ -0,0 +1,54 @@
+"""Check that importing the package stays within a cold-start budget.
+
+Usage: python -m shl_recommender.importtime [--budget-ms 100] [--module shl_recommender]
+Exits non-zero if the cumulative import time exceeds the budget or any heavy
+dependency is pulled in at import time.
+"""
+import argparse
+import subprocess
+import sys
+
+HEAVY_MODULES = ("llama_index", "pandas", "groq", "fastembed", "onnxruntime", "bs4", "requests")
+
+
+def measure_import(module: str):
+    code = (
+        f"import sys, {module}\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True,
+    )
+
+    # stderr lines look like: "import time:   self [us] | cumulative | imported package"
+    cumulative_us = 0
+    for line in result.stderr.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            cumulative_us = int(parts[1])
+    loaded_heavy = [m for m in result.stdout.strip().split(",") if m]
+    return cumulative_us / 1000, loaded_heavy
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="shl_recommender")
+    parser.add_argument("--budget-ms", type=float, default=100.0)
+    args = parser.parse_args(argv)
+
+    elapsed_ms, loaded_heavy = measure_import(args.module)
+    print(f"⏱️ import {args.module}: {elapsed_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    ok = True
+    if elapsed_ms > args.budget_ms:
+        print("❌ Import time over budget.")
+        ok = False
+    if loaded_heavy:
+        print(f"❌ Heavy modules imported eagerly: {', '.join(loaded_heavy)}")
+        ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
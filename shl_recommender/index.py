@@ -0,0 +1,35 @@
+from .ingestion import build_index, iter_shl_nodes
+from .settings import CATALOG_PATH, PERSIST_DIR, configure_settings
+from .tracing import span
+from .versions import bind_version_dir, has_index, resolve_persist_dir
+
+
+def load_index(persist_dir: str = PERSIST_DIR):
+    from llama_index.core import StorageContext, load_index_from_storage
+
+    from .snapshot import read_embed_profile
+
+    with span("index_load"):
+        # Resolved once: everything else about this index is read from the same version
+        version_dir = resolve_persist_dir(persist_dir)
+        # Queries must be embedded with the profile the index was built with
+        configure_settings(llm=False, profile=read_embed_profile(version_dir))
+        storage_context = StorageContext.from_defaults(persist_dir=version_dir)
+        return bind_version_dir(load_index_from_storage(storage_context), version_dir)
+
+
+def load_or_build_index(catalog_path: str = CATALOG_PATH, persist_dir: str = PERSIST_DIR):
+    # A half-written build is never visible: versions only go live once complete
+    if not has_index(persist_dir):
+        if catalog_path.endswith(".parquet"):
+            from .catalog import ensure_catalog
+
+            ensure_catalog(catalog_path)
+        print("📄 Creating new index from:", catalog_path)
+        index = build_index(iter_shl_nodes(catalog_path, chunksize=256), persist_dir)
+        print(f"✅ Loaded {len(index.docstore.docs)} assessments.")
+        print(f"💾 Index saved to '{persist_dir}' folder.")
+        return index
+
+    print("📦 Loading existing index from disk...")
+    return load_index(persist_dir)
@@ -0,0 +1,160 @@
+import os
+import uuid
+from itertools import islice
+from typing import Iterable, Optional
+
+from .settings import configure_settings
+from .versions import bind_version_dir
+
+METADATA_COLUMNS = ["assessment_name", "type", "duration_minutes", "remote", "adaptive", "job_levels", "languages", "url"]
+# Used for filtering and shard routing only; kept out of embeddings and prompts
+ROUTING_ONLY_METADATA = ["languages"]
+NODE_FIELDS = [
+    ("Assessment", "assessment_name"),
+    ("Description", "description"),
+    ("Type", "type"),
+    ("Duration", "duration"),
+    ("Remote", "remote"),
+    ("Adaptive", "adaptive"),
+    ("Job Levels", "job_levels"),
+    ("URL", "url"),
+]
+
+
+def format_duration(minutes: int) -> str:
+    if minutes == 9999:
+        return "Untimed"
+    if minutes == -1:
+        return "Variable"
+    return f"{minutes} minutes"
+
+
+# --- Flatten canonical catalog rows into node fields ---
+def normalize_catalog_frame(df):
+    import pandas as pd
+
+    from .catalog import canonical_frame, is_canonical
+
+    # Raw scraped CSV chunks go through the same parser as the canonical dataset
+    catalog = df if is_canonical(df) else canonical_frame(df)
+    minutes = catalog["duration_minutes"].astype(int)
+    out = pd.DataFrame({
+        "id": catalog["id"],
+        "assessment_name": catalog["assessment_name"],
+        "description": catalog["description"],
+        "type": catalog["types"].map(", ".join),
+        "remote": catalog["remote"].map({True: "Yes", False: "No"}),
+        "adaptive": catalog["adaptive"].map({True: "Yes", False: "No"}),
+        "job_levels": catalog["job_levels"].map(", ".join),
+        "languages": catalog["languages"].map(", ".join),
+        "url": catalog["url"],
+        "duration_minutes": minutes,
+    })
+    out["duration"] = (
+        (minutes.astype(str) + " minutes")
+        .mask(minutes == 9999, "Untimed")
+        .mask(minutes == -1, "Variable")
+    )
+    return out
+
+
+def render_node_texts(frame):
+    label, column = NODE_FIELDS[0]
+    text = f"{label}: " + frame[column]
+    for label, column in NODE_FIELDS[1:]:
+        text = text + f"\n{label}: " + frame[column]
+    return text
+
+
+def node_id_for(url: str, row: int) -> str:
+    # Stable across rebuilds and resumed ingestion; the row disambiguates repeated URLs
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{url}#{row}"))
+
+
+def nodes_from_frame(chunk, start_row: int = 0):
+    from llama_index.core.schema import TextNode
+
+    from .catalog import is_canonical
+
+    frame = normalize_catalog_frame(chunk)
+    texts = render_node_texts(frame)
+    metadata = frame[METADATA_COLUMNS].to_dict("records")
+    # The canonical dataset is one row per URL; raw CSVs can repeat a URL
+    canonical_ids = frame["id"].tolist() if is_canonical(chunk) else None
+    nodes = []
+    for row, (text, meta) in enumerate(zip(texts, metadata), start=start_row):
+        meta["duration_minutes"] = int(meta["duration_minutes"])
+        nodes.append(TextNode(
+            id_=canonical_ids[row - start_row] if canonical_ids else node_id_for(meta["url"], row),
+            text=text,
+            metadata=meta,
+            excluded_embed_metadata_keys=ROUTING_ONLY_METADATA,
+            excluded_llm_metadata_keys=ROUTING_ONLY_METADATA,
+        ))
+    return nodes
+
+
+# --- Stream SHL assessments as nodes with metadata, from the canonical
+# Parquet catalog or a raw scraped CSV ---
+def iter_shl_nodes(csv_path: str, chunksize: Optional[int] = None):
+    from .catalog import iter_catalog_frames
+
+    start_row = 0
+    for chunk in iter_catalog_frames(csv_path, chunksize):
+        yield from nodes_from_frame(chunk, start_row)
+        start_row += len(chunk)
+
+
+def load_shl_data_with_metadata(csv_path: str):
+    return list(iter_shl_nodes(csv_path))
+
+
+def shard_layout(shard_by: Optional[str] = None):
+    # SHL_SHARD_BY=hash (recommended) or language publishes the serving snapshot as shards
+    shard_by = shard_by if shard_by is not None else os.getenv("SHL_SHARD_BY", "")
+    return shard_by, int(os.getenv("SHL_SHARDS", "4"))
+
+
+# --- Persist the index, its two-stage projection and its serving snapshot as
+# one new immutable version, then atomically point readers at it ---
+def publish_index(
+    index,
+    persist_dir: str,
+    projection_dims: int = 128,
+    keep_versions: int = 3,
+    shard_by: Optional[str] = None,
+    profile: Optional[str] = None,
+) -> str:
+    from .coarse import build_projection
+    from .shards import export_sharded_snapshot
+    from .snapshot import export_snapshot
+    from .versions import published_dir, prune_versions, staged_version
+
+    shard_by, num_shards = shard_layout(shard_by)
+    with staged_version(persist_dir) as staging_dir:
+        index.storage_context.persist(persist_dir=staging_dir)
+        build_projection(index, staging_dir, dims=projection_dims)
+        if shard_by:
+            export_sharded_snapshot(index, staging_dir, by=shard_by, num_shards=num_shards, profile=profile)
+        else:
+            export_snapshot(index, staging_dir, profile=profile)
+    prune_versions(persist_dir, keep=keep_versions)
+    return published_dir(staging_dir)
+
+
+# --- Embed nodes and publish them as a new index version ---
+def build_index(
+    nodes: Iterable, persist_dir: str, projection_dims: int = 128, batch_size: int = 256, profile: Optional[str] = None
+):
+    from llama_index.core import VectorStoreIndex
+
+    configure_settings(llm=False, profile=profile)
+
+    # Embed in batches as nodes arrive, so a generator is never fully materialized
+    index = VectorStoreIndex([])
+    nodes = iter(nodes)
+    while batch := list(islice(nodes, batch_size)):
+        index.insert_nodes(batch)
+
+    version_dir = publish_index(index, persist_dir, projection_dims=projection_dims, profile=profile)
+    return bind_version_dir(index, version_dir)
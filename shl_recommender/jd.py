@@ -0,0 +1,117 @@
+import re
+from typing import List, Optional
+
+from .tracing import span
+
+# Lines that carry no signal about the role's skills
+BOILERPLATE_PATTERNS = re.compile(
+    r"equal opportunity|affirmative action|\beeo\b|without regard to|reasonable accommodation"
+    r"|privacy (policy|notice)|cookie|all rights reserved|terms of use|apply now|click here"
+    r"|share this job|sign in|follow us|\b401\(?k\)?|paid time off|\bpto\b|dental|vision insurance",
+    re.IGNORECASE,
+)
+# Cue words in any case ("Requirements", "Experience with ..."); the acronym
+# branch (SQL, AWS, C#) stays case-sensitive
+SKILL_CUES = re.compile(
+    r"(?i:skill|experience|proficien|knowledge|familiar|expert|require|responsib|qualif|ability|degree"
+    r"|years|must|develop|manage|analy|communicat)|\b[A-Z][A-Za-z+#.]*[A-Z+#]\b",
+)
+BULLET = re.compile(r"^\s*(?:[-*\u2022\u25aa\u25cf\u2013>]+|\d+[.)])\s+")
+# bge-large truncates at 512 tokens; ~200 words stays well under it
+MAX_CHUNK_WORDS = 200
+MAX_CHUNKS = 8
+
+
+# --- Extract job description text from a URL ---
+def extract_text_from_url(url: str, max_chars: Optional[int] = None, timeout: int = 10) -> str:
+    import requests
+    from bs4 import BeautifulSoup
+
+    try:
+        with span("jd_fetch"):
+            response = requests.get(url, timeout=timeout)
+        with span("jd_parse"):
+            soup = BeautifulSoup(response.content, "html.parser")
+            paragraphs = soup.find_all("p")
+            text = "\n".join([p.get_text() for p in paragraphs if p.get_text(strip=True)]).strip()
+        return text[:max_chars] if max_chars else text
+    except Exception as e:
+        print(f"❌ Failed to fetch or parse URL: {e}")
+        return ""
+
+
+def is_url(text: str) -> bool:
+    return text.startswith("http://") or text.startswith("https://")
+
+
+# --- Split a long job description into skill-focused chunks ---
+def _clean_paragraphs(text: str) -> List[str]:
+    seen, paragraphs = set(), []
+    for raw in text.splitlines():
+        line = " ".join(BULLET.sub("", raw).split())
+        if not line or BOILERPLATE_PATTERNS.search(line) or line.lower() in seen:
+            continue
+        seen.add(line.lower())
+        # Bullets and short lines ("Python", "Java 8 / Spring Boot") are list items; they join
+        # the paragraph or heading above them instead of being dropped or standing alone
+        is_item = BULLET.match(raw) is not None or len(re.findall(r"\w+", line)) < 4
+        if paragraphs and is_item and not line.endswith(":"):
+            separator = " " if paragraphs[-1].endswith((":", ",", ";", ".")) else ", "
+            paragraphs[-1] = f"{paragraphs[-1]}{separator}{line}"
+        else:
+            paragraphs.append(line)
+    return paragraphs
+
+
+def _split_long(paragraph: str, max_words: int) -> List[str]:
+    if len(paragraph.split()) <= max_words:
+        return [paragraph]
+    pieces, current = [], []
+    for sentence in re.split(r"(?<=[.!?;])\s+", paragraph):
+        words = sentence.split()
+        if current and len(current) + len(words) > max_words:
+            pieces.append(" ".join(current))
+            current = []
+        current.extend(words)
+        while len(current) > max_words:
+            pieces.append(" ".join(current[:max_words]))
+            current = current[max_words:]
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def split_job_description(text: str, max_chunk_words: int = MAX_CHUNK_WORDS, max_chunks: int = MAX_CHUNKS) -> List[str]:
+    paragraphs = _clean_paragraphs(text)
+    if not paragraphs:
+        return [text.strip()] if text.strip() else []
+    if sum(len(p.split()) for p in paragraphs) <= max_chunk_words:
+        return ["\n".join(paragraphs)]
+
+    chunks, current, current_words = [], [], 0
+    for paragraph in paragraphs:
+        for piece in _split_long(paragraph, max_chunk_words):
+            words = len(piece.split())
+            if current and current_words + words > max_chunk_words:
+                chunks.append("\n".join(current))
+                current, current_words = [], 0
+            current.append(piece)
+            current_words += words
+    if current:
+        chunks.append("\n".join(current))
+
+    if len(chunks) <= max_chunks:
+        return chunks
+    # Keep the chunks densest in skill/requirement cues, in their original order
+    ranked = sorted(range(len(chunks)), key=lambda i: -len(SKILL_CUES.findall(chunks[i])) / (len(chunks[i].split()) or 1))
+    return [chunks[i] for i in sorted(ranked[:max_chunks])]
+
+
+# scores is (candidates, chunks); an assessment ranks by its best-matching
+# chunk ("max") or by how many parts of the posting it covers ("sum")
+def fuse_chunk_scores(scores, method: str = "max"):
+    if method == "max":
+        return scores.max(axis=1)
+    if method == "sum":
+        return scores.clip(min=0).sum(axis=1)
+    raise ValueError(f"Unknown fusion method: {method} (expected max or sum)")
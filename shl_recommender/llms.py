@@ -0,0 +1,147 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, List, Optional, Sequence
+
+from llama_index.core.base.llms.types import (
+    ChatMessage,
+    ChatResponse,
+    ChatResponseAsyncGen,
+    ChatResponseGen,
+    CompletionResponse,
+    CompletionResponseGen,
+    LLMMetadata,
+)
+from llama_index.core.llms import CustomLLM
+from llama_index.core.llms.callbacks import llm_chat_callback, llm_completion_callback
+
+from .settings import LLM_MODEL_NAME
+
+BACKENDS = ("groq", "ollama", "openai_like", "mock")
+
+# Per-backend request timeouts in seconds, overridable via SHL_LLM_TIMEOUT_<BACKEND>
+DEFAULT_TIMEOUTS = {"groq": 30.0, "ollama": 120.0, "openai_like": 120.0, "mock": 1.0}
+
+_hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-hedge")
+
+
+def backend_timeout(backend: str) -> float:
+    return float(os.getenv(f"SHL_LLM_TIMEOUT_{backend.upper()}", DEFAULT_TIMEOUTS[backend]))
+
+
+# --- Construct one backend ---
+def make_llm(backend: str):
+    timeout = backend_timeout(backend)
+
+    if backend == "groq":
+        from llama_index.llms.groq import Groq
+
+        return Groq(model=os.getenv("SHL_GROQ_MODEL", LLM_MODEL_NAME), api_key=os.getenv("GROQ_API_KEY"), timeout=timeout)
+    if backend == "ollama":
+        from llama_index.llms.ollama import Ollama
+
+        return Ollama(
+            model=os.getenv("SHL_OLLAMA_MODEL", "llama3.2"),
+            base_url=os.getenv("SHL_OLLAMA_URL", "http://localhost:11434"),
+            request_timeout=timeout,
+        )
+    if backend == "openai_like":
+        # Any local OpenAI-compatible server (llama.cpp, vLLM, LM Studio, ...)
+        try:
+            from llama_index.llms.openai_like import OpenAILike
+        except ImportError as e:
+            raise ImportError("The openai_like backend needs `pip install llama-index-llms-openai-like`") from e
+
+        return OpenAILike(
+            model=os.getenv("SHL_OPENAI_LIKE_MODEL", "local-model"),
+            api_base=os.getenv("SHL_OPENAI_LIKE_URL", "http://localhost:8000/v1"),
+            api_key=os.getenv("SHL_OPENAI_LIKE_API_KEY", "not-needed"),
+            is_chat_model=True,
+            timeout=timeout,
+        )
+    if backend == "mock":
+        from llama_index.core.llms import MockLLM
+
+        return MockLLM(max_tokens=64)
+    raise ValueError(f"Unknown LLM backend: {backend} (expected one of {', '.join(BACKENDS)})")
+
+
+# Send the prompt to the primary backend; if it hasn't answered within
+# hedge_after_seconds (or it fails), race the fallbacks and take the first answer.
+class FallbackLLM(CustomLLM):
+    primary: Any
+    fallbacks: List[Any]
+    hedge_after_seconds: float = 8.0
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "FallbackLLM"
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return self.primary.metadata
+
+    def _hedged(self, method: str, *args, **kwargs):
+        primary = _hedge_pool.submit(getattr(self.primary, method), *args, **kwargs)
+        errors = []
+        try:
+            return primary.result(timeout=self.hedge_after_seconds)
+        except FutureTimeoutError:
+            pending = {primary}
+        except Exception as e:
+            # Kept, so an all-backends failure reports the primary's error too
+            errors.append(e)
+            pending = set()
+
+        pending |= {_hedge_pool.submit(getattr(llm, method), *args, **kwargs) for llm in self.fallbacks}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    errors.append(e)
+        raise RuntimeError(f"All LLM backends failed: {errors}")
+
+    @llm_completion_callback()
+    def complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        return self._hedged("complete", prompt, formatted=formatted, **kwargs)
+
+    @llm_completion_callback()
+    def stream_complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponseGen:
+        # Streams only start on iteration, so there is nothing to race here
+        return self.primary.stream_complete(prompt, formatted=formatted, **kwargs)
+
+    # Chat goes to the backends' own chat endpoints; CustomLLM's default would
+    # flatten the messages into a completion prompt
+    @llm_chat_callback()
+    def chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        return self._hedged("chat", messages, **kwargs)
+
+    @llm_chat_callback()
+    def stream_chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponseGen:
+        return self.primary.stream_chat(messages, **kwargs)
+
+    @llm_chat_callback()
+    async def achat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        # Hedging waits on threads, so it runs off the event loop
+        hedged = functools.partial(self._hedged, "chat", messages, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(_hedge_pool, hedged)
+
+    @llm_chat_callback()
+    async def astream_chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponseAsyncGen:
+        return await self.primary.astream_chat(messages, **kwargs)
+
+
+def build_llm(backend: Optional[str] = None, fallback: Optional[str] = None):
+    backend = backend or os.getenv("SHL_LLM_BACKEND", "groq")
+    fallback = fallback if fallback is not None else os.getenv("SHL_LLM_FALLBACK", "")
+
+    primary = make_llm(backend)
+    fallbacks = [make_llm(name) for name in fallback.split(",") if name and name != backend]
+    if not fallbacks:
+        return primary
+    hedge_after = float(os.getenv("SHL_LLM_HEDGE_AFTER", "8"))
+    return FallbackLLM(primary=primary, fallbacks=fallbacks, hedge_after_seconds=hedge_after)
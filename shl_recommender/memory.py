@@ -0,0 +1,205 @@
+"""Memory profile of index load, ingest and repeated queries, with budget checks.
+
+Usage: python -m shl_recommender.memory [--persist-dir shl_index] [--queries benchmarks/queries.jsonl]
+       [--repeat 100] [--warmup 2] [--ingest catalog.parquet] [--top 10]
+       [--budget-mb 32] [--heap-budget-mb 8] [--alloc-budget-mb 64] [--output report.json]
+
+Every stage is measured with tracemalloc (Python heap growth and peak, plus
+the allocation sites that grew most) and with the process RSS. Queries go
+through the same QueryPipeline the Streamlit app keeps per process, including
+the faceted candidate search; the LLM is stubbed (--llm mock) and the response,
+template and facet caches are off, so every query runs the full path.
+
+After --warmup passes over the queries (lazy loads, bounded caches filling up),
+--repeat more queries must not grow RSS by more than --budget-mb or the traced
+heap by more than --heap-budget-mb, and no single query may allocate more than
+--alloc-budget-mb at its peak. Exits non-zero when a budget is exceeded, so it
+can run in CI next to python -m shl_recommender.importtime.
+"""
+import argparse
+import gc
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from typing import Optional
+
+from .settings import PERSIST_DIR
+
+MB = 1024 * 1024
+
+
+def rss_mb() -> float:
+    # ru_maxrss only ever grows, so the current RSS is read from /proc where there is one
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / MB
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _top_growth(before, after, top: int):
+    return [str(stat) for stat in after.compare_to(before, "lineno")[:top] if stat.size_diff > 0]
+
+
+# tracemalloc and RSS around one stage; tracemalloc must already be tracing
+class MemoryProbe:
+    def __init__(self, stage: str, top: int = 10):
+        self.stage = stage
+        self.top = top
+        self.result = None
+
+    def __enter__(self):
+        # The snapshot is taken first so its own memory is not counted as growth
+        self._snapshot = tracemalloc.take_snapshot() if self.top else None
+        gc.collect()
+        self._rss = rss_mb()
+        self._heap = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        return self
+
+    def __exit__(self, *exc):
+        _, peak = tracemalloc.get_traced_memory()
+        gc.collect()
+        heap = tracemalloc.get_traced_memory()[0]
+        rss = rss_mb()
+        self.result = {
+            "stage": self.stage,
+            "rss_before_mb": self._rss,
+            "rss_after_mb": rss,
+            "rss_growth_mb": rss - self._rss,
+            "heap_growth_mb": (heap - self._heap) / MB,
+            "heap_peak_mb": (peak - self._heap) / MB,
+            "top": _top_growth(self._snapshot, tracemalloc.take_snapshot(), self.top) if self.top else [],
+        }
+        return False
+
+
+# --- Stages ---
+def profile_load(persist_dir: str = PERSIST_DIR, top: int = 10):
+    from .pipeline import QueryPipeline
+
+    with MemoryProbe("index_load", top) as probe:
+        pipeline = QueryPipeline(persist_dir=persist_dir, reload_interval=0)
+        pipeline.query_engine()
+        pipeline.faceted()
+    return pipeline, probe.result
+
+
+def profile_ingest(catalog_path: str, top: int = 10) -> dict:
+    from .ingestion import build_index, iter_shl_nodes
+
+    # Published into a throwaway root; the live index is never touched
+    persist_dir = tempfile.mkdtemp(prefix="shl-memory-")
+    try:
+        with MemoryProbe("ingest", top) as probe:
+            index = build_index(iter_shl_nodes(catalog_path, chunksize=256), persist_dir)
+            del index
+    finally:
+        shutil.rmtree(persist_dir, ignore_errors=True)
+    return probe.result
+
+
+def profile_queries(pipeline, queries, repeat: int = 100, warmup: int = 2, top: int = 10) -> dict:
+    from .benchmark import percentile
+
+    texts = [q["query"] for q in queries]
+
+    # Same work per click as z1.py: one wide candidate search, the LLM summarizes its head
+    def run(text: str):
+        pipeline.run(text, candidates=True)
+
+    for text in texts * warmup:
+        run(text)
+
+    peaks = []
+    with MemoryProbe("steady_state", top) as probe:
+        for i in range(repeat):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            run(texts[i % len(texts)])
+            peaks.append((tracemalloc.get_traced_memory()[1] - before) / MB)
+    probe.result.update({
+        "queries": repeat,
+        "heap_growth_per_query_kb": probe.result["heap_growth_mb"] * 1024 / max(repeat, 1),
+        "alloc_peak_p50_mb": percentile(peaks, 50),
+        "alloc_peak_max_mb": max(peaks, default=0.0),
+    })
+    return probe.result
+
+
+def check_budgets(steady: dict, budget_mb: float, heap_budget_mb: float, alloc_budget_mb: Optional[float]):
+    failures = []
+    if steady["rss_growth_mb"] > budget_mb:
+        failures.append(f"RSS grew {steady['rss_growth_mb']:.1f} MB over {steady['queries']} queries (budget {budget_mb:g} MB)")
+    if steady["heap_growth_mb"] > heap_budget_mb:
+        failures.append(f"Python heap grew {steady['heap_growth_mb']:.1f} MB (budget {heap_budget_mb:g} MB)")
+    if alloc_budget_mb is not None and steady["alloc_peak_max_mb"] > alloc_budget_mb:
+        failures.append(f"One query allocated {steady['alloc_peak_max_mb']:.1f} MB at peak (budget {alloc_budget_mb:g} MB)")
+    return failures
+
+
+def format_report(stages) -> str:
+    columns = ["stage", "rss_before_mb", "rss_after_mb", "rss_growth_mb", "heap_growth_mb", "heap_peak_mb"]
+    lines = ["| " + " | ".join(columns) + " |", "|" + "---|" * len(columns)]
+    for row in stages:
+        lines.append("| " + " | ".join([row["stage"]] + [f"{row[c]:.1f}" for c in columns[1:]]) + " |")
+    for row in stages:
+        if row["top"]:
+            lines.append(f"\nLargest growth during {row['stage']}:")
+            lines.extend(f"    {line}" for line in row["top"])
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    from .benchmark import load_queries
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--persist-dir", default=PERSIST_DIR)
+    parser.add_argument("--queries", default="benchmarks/queries.jsonl")
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--ingest", help="Also profile building an index from this catalog")
+    parser.add_argument("--top", type=int, default=10, help="Allocation sites to list per stage; 0 skips snapshots")
+    parser.add_argument("--llm", default="mock", help="LLM backend for synthesis")
+    parser.add_argument("--budget-mb", type=float, default=32.0)
+    parser.add_argument("--heap-budget-mb", type=float, default=8.0)
+    parser.add_argument("--alloc-budget-mb", type=float, default=64.0)
+    parser.add_argument("--output", help="Write the raw report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    os.environ["SHL_LLM_BACKEND"] = args.llm
+    os.environ.setdefault("SHL_LLM_CACHE_TTL", "0")
+    os.environ.setdefault("SHL_TEMPLATE_CACHE", "0")
+    os.environ.setdefault("SHL_FACET_CACHE_TTL", "0")
+    queries = load_queries(args.queries)
+
+    tracemalloc.start()
+    pipeline, load = profile_load(args.persist_dir, args.top)
+    steady = profile_queries(pipeline, queries, args.repeat, args.warmup, args.top)
+    stages = [load, steady]
+    if args.ingest:
+        stages.append(profile_ingest(args.ingest, args.top))
+    tracemalloc.stop()
+
+    print(format_report(stages))
+    print(
+        f"\n🧮 {steady['queries']} queries after warm-up: RSS {steady['rss_growth_mb']:+.1f} MB, "
+        f"heap {steady['heap_growth_per_query_kb']:+.1f} KB/query, "
+        f"peak per query {steady['alloc_peak_p50_mb']:.1f} MB (p50) / {steady['alloc_peak_max_mb']:.1f} MB (max)"
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(stages, f, indent=2)
+
+    failures = check_budgets(steady, args.budget_mb, args.heap_budget_mb, args.alloc_budget_mb)
+    for failure in failures:
+        print(f"❌ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
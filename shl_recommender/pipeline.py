@@ -0,0 +1,212 @@
+import contextvars
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from .jd import extract_text_from_url, is_url
+from .settings import CATALOG_PATH, PERSIST_DIR, configure_settings
+from .snapshot import read_embed_profile
+from .tracing import span
+from .versions import VersionWatcher, bind_version_dir, has_index, index_version_dir, resolve_persist_dir
+
+_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="shl-pipeline")
+
+
+def _submit(fn, *args, **kwargs):
+    # Each task runs in a copy of the caller's context, so its spans land in the caller's trace
+    return _pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def resolve_query(user_input: str) -> str:
+    return extract_text_from_url(user_input) if is_url(user_input) else user_input
+
+
+def warm_embedder(profile: Optional[str] = None):
+    from llama_index.core.settings import Settings
+
+    # Building the model creates the ONNX session; one encode pages its weights in
+    with span("embed_warmup"):
+        configure_settings(llm=False, profile=profile)
+        Settings.embed_model.get_query_embedding("warmup")
+    return Settings.embed_model
+
+
+def _load_storage(version_dir: str):
+    from llama_index.core import StorageContext
+
+    with span("index_storage_load"):
+        return StorageContext.from_defaults(persist_dir=version_dir)
+
+
+# One index version and everything built on it. The pipeline swaps the whole
+# object at once, so a request never mixes one version's engine with another's facets
+class ServedVersion:
+    def __init__(self, version_dir: Optional[str], index_future, embedder_future, similarity_top_k: int = 10):
+        self.version_dir = version_dir
+        self.similarity_top_k = similarity_top_k
+        self._index = index_future
+        self._embedder = embedder_future
+        self._lock = threading.Lock()
+        self._query_engine = None
+        self._faceted = None
+
+    @property
+    def index(self):
+        return self._index.result()
+
+    def query_engine(self):
+        from .query import build_query_engine
+
+        with self._lock:
+            if self._query_engine is None:
+                self._query_engine = build_query_engine(self.index, similarity_top_k=self.similarity_top_k)
+            return self._query_engine
+
+    def faceted(self):
+        from .facets import FacetedSearch
+
+        with self._lock:
+            if self._faceted is None:
+                self._faceted = FacetedSearch(self.index, embed_model=self._embedder.result())
+            return self._faceted
+
+
+# Runs a request as overlapping stages instead of one after another:
+#   JD fetch/parse  ||  docstore + vector store load  ||  embedder warmup
+#   query embedding as soon as the text and the model are ready
+#   LLM synthesis starts right after retrieval, while on_results renders the table
+# With candidates=True the top candidate_k of FacetedSearch are retrieved once; the
+# first similarity_top_k go to the LLM and on_results(query_bundle, nodes,
+# candidates) gets the whole CandidateSet for refining (None otherwise), also
+# when the answer itself came from a template.
+# Like serve.py, a VersionWatcher picks up newly published versions: each one is
+# loaded in the background and swapped in as one ServedVersion; in-flight
+# requests finish on the version they started with
+class QueryPipeline:
+    def __init__(
+        self,
+        catalog_path: str = CATALOG_PATH,
+        persist_dir: str = PERSIST_DIR,
+        similarity_top_k: int = 10,
+        reload_interval: Optional[float] = None,
+    ):
+        self.catalog_path = catalog_path
+        self.persist_dir = persist_dir
+        self.similarity_top_k = similarity_top_k
+        # Resolved once, so the docstore, projection and embedding profile all come from one version
+        version_dir = resolve_persist_dir(persist_dir) if has_index(persist_dir) else None
+        self.profile = read_embed_profile(version_dir) if version_dir else None
+        # Loading starts right away, e.g. while the user is still typing
+        self._embedder = _submit(warm_embedder, self.profile)
+        index = _submit(self._load_index, version_dir)
+        self._served = ServedVersion(version_dir, index, self._embedder, similarity_top_k)
+
+        # SHL_RELOAD_INTERVAL=0 pins the version live at construction
+        if reload_interval is None:
+            reload_interval = float(os.getenv("SHL_RELOAD_INTERVAL", "5"))
+        self._watcher = None
+        if reload_interval > 0:
+            self._watcher = VersionWatcher(persist_dir, self._swap, reload_interval)
+            self._watcher.start()
+
+    def _load_index(self, version_dir: Optional[str]):
+        from llama_index.core import load_index_from_storage
+
+        from .index import load_or_build_index
+
+        if version_dir is None:
+            return load_or_build_index(self.catalog_path, self.persist_dir)
+        storage_context = _load_storage(version_dir)
+        with span("index_load"):
+            index = load_index_from_storage(storage_context, embed_model=self._embedder.result())
+        return bind_version_dir(index, version_dir)
+
+    def _swap(self, version: str, version_dir: str):
+        from .settings import embed_profile
+
+        if index_version_dir(self._served.index) == version_dir:
+            return
+        # Queries are embedded by one long-lived model, so a version built with
+        # another profile can only be served after a restart
+        profile = read_embed_profile(version_dir)
+        if self.profile is not None and embed_profile(profile) != embed_profile(self.profile):
+            print(f"⚠️ Index version {version} uses embedding profile '{profile}'; restart to serve it.")
+            return
+        index = Future()
+        index.set_result(self._load_index(version_dir))
+        fresh = ServedVersion(version_dir, index, self._embedder, self.similarity_top_k)
+        # Built before the swap, so no request pays for the new version's setup
+        fresh.query_engine()
+        fresh.faceted()
+        self._served = fresh
+        print(f"🔄 Now serving index version {version} ({len(fresh.index.docstore.docs)} assessments).")
+
+    def stop(self):
+        if self._watcher is not None:
+            self._watcher.stop()
+
+    @property
+    def version_dir(self) -> Optional[str]:
+        return self._served.version_dir
+
+    @property
+    def index(self):
+        return self._served.index
+
+    def query_engine(self):
+        return self._served.query_engine()
+
+    def faceted(self):
+        return self._served.faceted()
+
+    def run(
+        self,
+        user_input: str,
+        on_query_text: Optional[Callable[[str], None]] = None,
+        on_results: Optional[Callable] = None,
+        candidates: bool = False,
+    ):
+        from llama_index.core.schema import QueryBundle
+
+        from .coarse import embed_query_bundle
+
+        # Fetching runs here while the index and the embedder load in the background
+        query_text = resolve_query(user_input)
+        if on_query_text is not None:
+            on_query_text(query_text)
+        if not query_text:
+            return query_text, None
+
+        # Read once: the whole request is served by one version even if a swap lands meanwhile
+        served = self._served
+        # An exact template hit needs neither the query embedding nor a vector search
+        query_engine = served.query_engine()
+        query_bundle = QueryBundle(query_text)
+        hit = query_engine.lookup_template(query_bundle)
+        if hit is None:
+            with span("embed_query"):
+                query_bundle = embed_query_bundle(query_bundle, self._embedder.result())
+            # Near-duplicate template match; chunked long postings have no single embedding
+            if query_bundle.embedding is not None:
+                hit = query_engine.lookup_template(query_bundle)
+        if hit is not None:
+            # Refining still needs the full candidate list; FacetedSearch caches it per query,
+            # so a popular template is embedded and searched once per cache TTL
+            candidate_set = served.faceted().candidates(query_bundle) if candidates else None
+            if on_results is not None:
+                on_results(query_bundle, hit.source_nodes, candidate_set)
+            return query_text, hit
+
+        if candidates:
+            # One wide search: its head is what the LLM summarizes, the rest feeds the facets
+            candidate_set = served.faceted().candidates(query_bundle)
+            nodes = candidate_set.nodes[:self.similarity_top_k]
+        else:
+            candidate_set = None
+            with span("vector_search"):
+                nodes = query_engine.retrieve(query_bundle)
+        synthesis = _submit(query_engine.synthesize, query_bundle, nodes)
+        if on_results is not None:
+            on_results(query_bundle, nodes, candidate_set)
+        return query_text, synthesis.result()
@@ -0,0 +1,74 @@
+import os
+from typing import Optional
+
+from .settings import configure_settings, get_llm
+from .versions import index_version_dir
+
+
+def build_retriever(index, similarity_top_k: int = 10, search_mode: Optional[str] = None):
+    from .coarse import MultiVectorRetriever, TwoStageRetriever, load_projection
+
+    search_mode = search_mode or os.getenv("SHL_SEARCH_MODE", "dense")
+    # The projection must cover exactly this index's nodes: an in-memory index has none
+    version_dir = index_version_dir(index)
+    projection = load_projection(version_dir) if version_dir else None
+
+    if search_mode == "two_stage" and projection is not None:
+        # Coarse pass on the reduced projection, full-dimension rerank of the shortlist
+        retriever = TwoStageRetriever(index, projection, similarity_top_k=similarity_top_k, shortlist=100)
+    else:
+        retriever = index.as_retriever(similarity_top_k=similarity_top_k)
+
+    # Chunked long job descriptions bypass the single-vector retriever
+    fusion = os.getenv("SHL_JD_FUSION", "max")
+    return MultiVectorRetriever(retriever, index, projection, similarity_top_k=similarity_top_k, fusion=fusion)
+
+
+def build_query_engine(
+    index,
+    similarity_top_k: int = 10,
+    search_mode: Optional[str] = None,
+    context_token_budget: Optional[int] = None,
+    cache_ttl_seconds: Optional[float] = None,
+    llm=None,
+    template_cache=None,
+):
+    from llama_index.core.query_engine import RetrieverQueryEngine
+    from llama_index.core.settings import Settings
+
+    from .cache import CachedQueryEngine, default_response_cache
+    from .context import ContextPacker, PackedCompactAndRefine
+    from .snapshot import read_embed_profile
+
+    # An explicit llm (e.g. a local stub) bypasses the configured backend entirely.
+    # An index loaded from disk is queried with its recorded profile; an
+    # in-memory index keeps the model it was just embedded with
+    version_dir = index_version_dir(index)
+    profile = read_embed_profile(version_dir) if version_dir else None
+    configure_settings(llm=llm is None, embed=version_dir is not None, profile=profile)
+    retriever = build_retriever(index, similarity_top_k, search_mode)
+
+    # Trim node texts to the prompt fields so synthesis fits in a single call
+    if context_token_budget is None:
+        context_token_budget = int(os.getenv("SHL_CONTEXT_TOKEN_BUDGET", "2500"))
+    # Packed inside synthesis, not as a node postprocessor, so retrieved nodes and
+    # response.source_nodes keep their full text and URL.
+    # from_args falls back to Settings.llm (llama-index's OpenAI default) unless given one
+    synthesizer = PackedCompactAndRefine(ContextPacker(token_budget=context_token_budget), llm=llm)
+    query_engine = RetrieverQueryEngine.from_args(retriever, llm=llm, response_synthesizer=synthesizer)
+
+    # SHL_LLM_CACHE_TTL=0 disables the response cache
+    if cache_ttl_seconds is None:
+        cache_ttl_seconds = float(os.getenv("SHL_LLM_CACHE_TTL", "3600"))
+    cache = default_response_cache(cache_ttl_seconds) if cache_ttl_seconds > 0 else None
+    model_name = (llm or get_llm()).metadata.model_name
+
+    # Answers precomputed by `python -m shl_recommender.templates`; False or SHL_TEMPLATE_CACHE=0 disables
+    if template_cache is None and os.getenv("SHL_TEMPLATE_CACHE", "1") != "0":
+        from .templates import TemplateCache
+
+        threshold = float(os.getenv("SHL_TEMPLATE_THRESHOLD", "0.95"))
+        template_cache = TemplateCache.load(index, threshold=threshold)
+    # An empty cache can never hit, so skip the lookups
+    templates = template_cache or None
+    return CachedQueryEngine(query_engine, cache, model_name, embed_model=Settings.embed_model, templates=templates)
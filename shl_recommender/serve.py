@@ -0,0 +1,188 @@
+"""Pre-forked search API over a shared, memory-mapped index snapshot.
+
+Usage: python -m shl_recommender.serve [--snapshot shl_index] [--workers 4] [--port 8000]
+       [--embedder-socket /run/shl-embedder.sock] [--reload-interval 5]
+
+Endpoints:
+    GET /search?q=<text>&k=10[&max_duration=60&job_level=mid&remote=Yes&adaptive=No&language=French]
+    GET /healthz
+
+The snapshot is mapped read-only, so every worker shares the same physical
+pages. The embedding model lives in one dedicated process that workers call
+over a Unix socket; pass --embedder-socket (with SHL_EMBEDDER_AUTHKEY) to
+reuse an embedder that is already running on the host (it must run the
+embedding profile recorded in the snapshot manifest).
+
+--snapshot is either a versioned persist root (as written by ingestion) or a
+plain snapshot directory, sharded or not. For a versioned root, every worker
+watches the CURRENT pointer and swaps a newly published version in without a
+restart, unless that version was built with another embedding profile.
+Sharded snapshots are searched on a per-worker thread pool.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import secrets
+import signal
+import socket
+import sys
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+from .embedder import EmbedderClient, run_embedder_server
+from .jd import split_job_description
+from .snapshot import LiveSnapshot
+
+MAX_TOP_K = 200
+FILTER_PARAMS = {"max_duration": int, "job_level": str, "remote": str, "adaptive": str, "language": str}
+
+
+def parse_filters(params: dict) -> dict:
+    return {name: cast(params[name][0]) for name, cast in FILTER_PARAMS.items() if name in params}
+
+
+def make_handler(live: LiveSnapshot, embedder: EmbedderClient):
+    class SearchHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status: int, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            # Pin one version for the whole request
+            index = live.current
+            url = urlparse(self.path)
+            if url.path == "/healthz":
+                return self._send_json(200, {
+                    "ok": True, "pid": os.getpid(), "count": len(index), "version": os.path.basename(index.path),
+                })
+            if url.path != "/search":
+                return self._send_json(404, {"error": "not found"})
+
+            params = parse_qs(url.query)
+            query = params.get("q", [""])[0].strip()
+            if not query:
+                return self._send_json(400, {"error": "missing q"})
+            try:
+                top_k = int(params.get("k", ["10"])[0])
+                filters = parse_filters(params)
+            except ValueError as e:
+                return self._send_json(400, {"error": str(e)})
+            if not 1 <= top_k <= MAX_TOP_K:
+                return self._send_json(400, {"error": f"k must be between 1 and {MAX_TOP_K}"})
+
+            # A failed embed or search answers with a 500 instead of dropping the connection
+            try:
+                # Long job descriptions are searched as one batch of chunk embeddings
+                chunks = split_job_description(query)
+                embeddings = embedder.embed(chunks if len(chunks) > 1 else [query], kind="query")
+                hits = index.search(
+                    embeddings if len(embeddings) > 1 else embeddings[0], top_k=top_k, filters=filters,
+                    fusion=os.getenv("SHL_JD_FUSION", "max"),
+                )
+            except Exception as e:
+                return self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+            self._send_json(200, {
+                "query": query,
+                "results": [{"score": score, **record["metadata"]} for record, score in hits],
+            })
+
+        def log_message(self, format, *args):
+            pass
+
+    return SearchHandler
+
+
+def _worker(listen_socket: socket.socket, live: LiveSnapshot, embedder: EmbedderClient, reload_interval: float):
+    signal.signal(signal.SIGTERM, lambda *_: os._exit(0))
+    # Threads don't survive fork, so each worker runs its own watcher
+    if reload_interval > 0:
+        live.watch(reload_interval)
+    server = HTTPServer(listen_socket.getsockname(), make_handler(live, embedder), bind_and_activate=False)
+    # Every worker accepts on the listening socket inherited from the parent
+    server.socket = listen_socket
+    server.serve_forever()
+
+
+def _start_embedder(socket_path: str, authkey: bytes, profile: Optional[str] = None):
+    # Spawned, not forked: the ONNX session is created only in this process
+    process = multiprocessing.get_context("spawn").Process(
+        target=run_embedder_server, args=(socket_path, authkey, profile), daemon=True, name="shl-embedder"
+    )
+    process.start()
+    while not os.path.exists(socket_path):
+        if not process.is_alive():
+            raise RuntimeError("Embedder process exited during startup")
+        time.sleep(0.1)
+    return process
+
+
+def serve(
+    snapshot: str,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    workers: int = 4,
+    embedder_socket: Optional[str] = None,
+    reload_interval: float = 5.0,
+):
+    # Opened before forking; children inherit the mappings
+    live = LiveSnapshot(snapshot)
+
+    if embedder_socket:
+        authkey = os.environ["SHL_EMBEDDER_AUTHKEY"].encode("utf-8")
+        embedder_process = None
+    else:
+        authkey = secrets.token_bytes(32)
+        embedder_socket = os.path.join(tempfile.mkdtemp(prefix="shl-embedder-"), "embedder.sock")
+        # The embedder runs the profile recorded in the snapshot manifest
+        embedder_process = _start_embedder(embedder_socket, authkey, live.embed_profile)
+    listen_socket = socket.create_server((host, port), backlog=128)
+    print(f"🚀 Serving {len(live.current)} assessments on http://{host}:{port} with {workers} workers.")
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            _worker(listen_socket, live, EmbedderClient(embedder_socket, authkey), reload_interval)
+            os._exit(0)
+        children.append(pid)
+
+    def shutdown(*_):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        if embedder_process is not None:
+            embedder_process.terminate()
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    for pid in children:
+        os.waitpid(pid, 0)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--snapshot", default="shl_index")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--embedder-socket", help="Reuse an already running embedder at this Unix socket")
+    parser.add_argument("--reload-interval", type=float, default=5.0, help="Seconds between version checks; 0 disables")
+    args = parser.parse_args(argv)
+
+    serve(args.snapshot, args.host, args.port, args.workers, args.embedder_socket, args.reload_interval)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
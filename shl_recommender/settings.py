@@ -0,0 +1,70 @@
+import os
+import threading
+from functools import lru_cache
+from typing import Optional
+
+# --- Defaults shared by every entry point ---
+LLM_MODEL_NAME = "meta-llama/llama-4-scout-17b-16e-instruct"
+EMBED_MODEL_NAME = "BAAI/bge-large-en-v1.5"
+CSV_PATH = "rex.csv"
+PERSIST_DIR = "shl_index"
+# Scraped CSVs, highest priority first, normalized into one Parquet dataset
+CATALOG_SOURCES = (CSV_PATH, "final.csv", "shl_product_catalog_updated.csv", "combined_catalog.csv")
+CATALOG_PATH = "catalog.parquet"
+
+# --- Embedding profiles: SHL_EMBED_PROFILE picks one for new indexes ---
+# FastEmbed already ships bge-small/base as int8 ONNX exports; the -int8
+# profiles quantize the fp32 exports locally (see shl_recommender.embeddings)
+EMBED_PROFILES = {
+    "minilm": {"model": "sentence-transformers/all-MiniLM-L6-v2", "quantize": False},
+    "minilm-int8": {"model": "sentence-transformers/all-MiniLM-L6-v2", "quantize": True},
+    "bge-small": {"model": "BAAI/bge-small-en-v1.5", "quantize": False},
+    "bge-base": {"model": "BAAI/bge-base-en-v1.5", "quantize": False},
+    "bge-large": {"model": "BAAI/bge-large-en-v1.5", "quantize": False},
+    "bge-large-int8": {"model": "BAAI/bge-large-en-v1.5", "quantize": True},
+}
+DEFAULT_EMBED_PROFILE = "bge-large"
+
+
+# Heavy clients are only constructed (and imported) on first use
+# SHL_LLM_BACKEND picks groq/ollama/openai_like/mock; SHL_LLM_FALLBACK adds hedged fallbacks
+@lru_cache(maxsize=None)
+def get_llm(backend: Optional[str] = None, fallback: Optional[str] = None):
+    from .llms import build_llm
+
+    return build_llm(backend, fallback)
+
+
+def embed_profile(name: Optional[str] = None) -> str:
+    # An explicit profile (e.g. the one recorded in an index manifest) wins over SHL_EMBED_PROFILE;
+    # bare model names, as older manifests record them, map back to their profile
+    name = name or os.getenv("SHL_EMBED_PROFILE", DEFAULT_EMBED_PROFILE)
+    for profile, spec in EMBED_PROFILES.items():
+        if name == spec["model"] and not spec["quantize"]:
+            return profile
+    return name
+
+
+def get_embed_model(profile: Optional[str] = None):
+    return _build_embed_model(embed_profile(profile))
+
+
+@lru_cache(maxsize=None)
+def _build_embed_model(profile: str):
+    from .embeddings import build_embed_model
+
+    return build_embed_model(profile)
+
+
+# Background loaders may configure concurrently; models must be built only once
+_configure_lock = threading.Lock()
+
+
+def configure_settings(llm: bool = True, embed: bool = True, profile: Optional[str] = None):
+    from llama_index.core.settings import Settings
+
+    with _configure_lock:
+        if embed:
+            Settings.embed_model = get_embed_model(profile)
+        if llm:
+            Settings.llm = get_llm()
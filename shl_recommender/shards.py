@@ -0,0 +1,174 @@
+"""Catalog snapshots partitioned into shards and searched in parallel.
+
+A sharded snapshot directory holds shards.json plus one regular snapshot per
+shard under shards/<name>/. Every assessment is stored once, in its primary
+shard: a stable hash of the node id (the default, evenly sized shards) or its
+first listed language (on the SHL catalog: 22 shards, one holding 329 of 458
+assessments and many holding 1-3). shards.json also lists, per language, the
+rows of each shard offered in that language, so a language filter only scans
+those rows; every other query searches all shards and merges their top-k.
+"""
+import json
+import os
+import re
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+from .snapshot import SnapshotIndex, SnapshotWriter, embed_manifest
+
+SHARDS_FILE = "shards.json"
+SHARDS_DIR = "shards"
+SHARD_KEYS = ("hash", "language")
+UNSPECIFIED = "unspecified"
+
+
+def is_sharded(path: str) -> bool:
+    return os.path.exists(os.path.join(path, SHARDS_FILE))
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-") or UNSPECIFIED
+
+
+def _languages(metadata: dict):
+    return [lang.strip() for lang in str(metadata.get("languages", "")).split(",") if lang.strip()]
+
+
+def shard_key(node_id: str, metadata: dict, by: str, num_shards: int = 4) -> str:
+    if by == "hash":
+        return f"hash-{zlib.crc32(node_id.encode('utf-8')) % num_shards:02d}"
+    if by == "language":
+        return (_languages(metadata) or [UNSPECIFIED])[0]
+    raise ValueError(f"Unknown shard key: {by} (expected one of {', '.join(SHARD_KEYS)})")
+
+
+# --- Write one snapshot per shard ---
+# Shard sizes must be known up front (see SnapshotWriter); rows are then
+# routed to their shards as they stream in
+class ShardedSnapshotWriter:
+    def __init__(
+        self, out_dir: str, counts: dict, dim: int, by: str = "hash", num_shards: int = 4, profile: Optional[str] = None
+    ):
+        self.out_dir = out_dir
+        self.by = by
+        self.num_shards = num_shards
+        self.profile = profile
+        self.writers = {
+            key: SnapshotWriter(os.path.join(out_dir, SHARDS_DIR, _slug(key)), count, dim, profile=profile)
+            for key, count in sorted(counts.items())
+        }
+        self.languages = {}
+        self.count = 0
+
+    def add(self, node, vector):
+        key = shard_key(node.node_id, node.metadata, self.by, self.num_shards)
+        writer = self.writers[key]
+        row = len(writer.offsets) - 1
+        for language in _languages(node.metadata):
+            self.languages.setdefault(language, {}).setdefault(_slug(key), []).append(row)
+        writer.add(node, vector)
+        self.count += 1
+
+    def close(self) -> dict:
+        shards = {}
+        for key, writer in self.writers.items():
+            shards[_slug(key)] = {"key": key, "count": writer.close()["count"]}
+        manifest = {
+            "by": self.by,
+            "count": self.count,
+            **embed_manifest(self.profile),
+            "shards": shards,
+            "languages": self.languages,
+        }
+        with open(os.path.join(self.out_dir, SHARDS_FILE), "w") as f:
+            json.dump(manifest, f)
+        return manifest
+
+
+def shard_counts(nodes, by: str = "hash", num_shards: int = 4) -> dict:
+    counts = {}
+    for node in nodes:
+        key = shard_key(node.node_id, node.metadata, by, num_shards)
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+# --- Export one snapshot per shard ---
+def export_sharded_snapshot(
+    index, out_dir: str, by: str = "hash", num_shards: int = 4, profile: Optional[str] = None
+) -> dict:
+    embedding_dict = index.vector_store.data.embedding_dict
+    node_ids = list(embedding_dict)
+    counts = shard_counts((index.docstore.get_node(i) for i in node_ids), by, num_shards)
+    dim = len(embedding_dict[node_ids[0]]) if node_ids else 0
+
+    writer = ShardedSnapshotWriter(out_dir, counts, dim, by=by, num_shards=num_shards, profile=profile)
+    for node_id in node_ids:
+        writer.add(index.docstore.get_node(node_id), embedding_dict[node_id])
+    return writer.close()
+
+
+class ShardedSnapshotIndex:
+    def __init__(self, path: str, workers: Optional[int] = None):
+        self.path = path
+        with open(os.path.join(path, SHARDS_FILE)) as f:
+            self.manifest = json.load(f)
+        self.shards = {name: SnapshotIndex(os.path.join(path, SHARDS_DIR, name)) for name in self.manifest["shards"]}
+        self.languages = {
+            language: {shard: np.asarray(rows, dtype=np.int64) for shard, rows in by_shard.items()}
+            for language, by_shard in self.manifest["languages"].items()
+        }
+        self.workers = workers or int(os.getenv("SHL_SHARD_WORKERS", "0")) or min(len(self.shards), os.cpu_count() or 1) or 1
+        self._pool = None
+        self._pool_pid = None
+
+    def __len__(self):
+        return self.manifest["count"]
+
+    def _executor(self) -> ThreadPoolExecutor:
+        # Worker threads don't survive fork, so each process starts its own pool
+        if self._pool is None or self._pool_pid != os.getpid():
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="shl-shard")
+            self._pool_pid = os.getpid()
+        return self._pool
+
+    def route(self, filters: Optional[dict] = None) -> dict:
+        # Shard name -> rows to scan (None: the whole shard)
+        language = (filters or {}).get("language")
+        if language is None:
+            return dict.fromkeys(self.shards)
+        # Same substring match as matches_filters, so "English" covers "English (USA)"
+        matching = [rows for name, rows in self.languages.items() if language.lower() in name.lower()]
+        return {
+            shard: np.unique(np.concatenate([rows[shard] for rows in matching if shard in rows]))
+            for shard in self.shards
+            if any(shard in rows for rows in matching)
+        }
+
+    def search(self, query_embedding, top_k: int = 10, filters: Optional[dict] = None, candidate_k: int = 200, fusion: str = "max"):
+        routes = self.route(filters)
+        if len(routes) == 1:
+            (name, rows), = routes.items()
+            return self.shards[name].search(query_embedding, top_k, filters, candidate_k, fusion, rows=rows)
+
+        # numpy releases the GIL during the matmul, so shard scans overlap on threads
+        futures = [
+            self._executor().submit(self.shards[name].search, query_embedding, top_k, filters, candidate_k, fusion, rows)
+            for name, rows in routes.items()
+        ]
+        hits = sorted((hit for future in futures for hit in future.result()), key=lambda hit: -hit[1])
+        return hits[:top_k]
+
+    def warm(self):
+        for shard in self.shards.values():
+            shard.warm()
+        return self
+
+    def close(self):
+        for shard in self.shards.values():
+            shard.close()
+        if self._pool is not None and self._pool_pid == os.getpid():
+            self._pool.shutdown(wait=False)
@@ -0,0 +1,229 @@
+"""Read-only index snapshots that worker processes memory-map instead of loading.
+
+Usage: python -m shl_recommender.snapshot [--persist-dir shl_index] [--out shl_snapshot]
+       [--shard-by hash|language] [--shards 4]
+
+A snapshot directory holds:
+    vectors.npy    float32 (n, dim), L2-normalized
+    records.bin    one UTF-8 JSON record ({"id", "text", "metadata"}) per row
+    offsets.npy    int64 (n + 1,) byte offsets into records.bin
+    manifest.json  count, dim, embedding profile and model, creation time
+"""
+import argparse
+import json
+import mmap
+import os
+import sys
+import time
+from typing import Optional
+
+import numpy as np
+
+from .filters import matches_filters
+from .jd import fuse_chunk_scores
+from .settings import EMBED_PROFILES, PERSIST_DIR, embed_profile
+from .versions import VersionWatcher, index_version_dir, resolve_persist_dir
+
+VECTORS_FILE = "vectors.npy"
+RECORDS_FILE = "records.bin"
+OFFSETS_FILE = "offsets.npy"
+MANIFEST_FILE = "manifest.json"
+
+
+def embed_manifest(profile: Optional[str] = None) -> dict:
+    profile = embed_profile(profile)
+    spec = EMBED_PROFILES.get(profile, {"model": profile, "quantize": False})
+    return {"embed_profile": profile, "embed_model": spec["model"], "quantized": spec["quantize"]}
+
+
+def read_embed_profile(path: str) -> Optional[str]:
+    # Plain snapshots record it in manifest.json, sharded ones in shards.json;
+    # manifests written before profiles existed only name the model
+    from .shards import SHARDS_FILE
+
+    for name in (MANIFEST_FILE, SHARDS_FILE):
+        manifest_path = os.path.join(path, name)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            return manifest.get("embed_profile") or manifest.get("embed_model")
+    return None
+
+
+# --- Write the snapshot layout one row at a time ---
+# vectors.npy is a memory-mapped file sized up front, so rows can come from a
+# stream (an index, or embedded parts on disk) without the catalog in memory
+class SnapshotWriter:
+    def __init__(self, out_dir: str, count: int, dim: int, profile: Optional[str] = None):
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.profile = profile
+        self.vectors = np.lib.format.open_memmap(
+            os.path.join(out_dir, VECTORS_FILE), mode="w+", dtype=np.float32, shape=(count, dim)
+        )
+        self.offsets = [0]
+        self._records = open(os.path.join(out_dir, RECORDS_FILE), "wb")
+
+    def add(self, node, vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        self.vectors[len(self.offsets) - 1] = vector / norm if norm else vector
+        record = {"id": node.node_id, "text": node.get_content(), "metadata": node.metadata}
+        self.offsets.append(self.offsets[-1] + self._records.write(json.dumps(record).encode("utf-8")))
+
+    def close(self) -> dict:
+        count, dim = self.vectors.shape
+        if len(self.offsets) - 1 != count:
+            raise ValueError(f"Snapshot in '{self.out_dir}' got {len(self.offsets) - 1} rows, expected {count}")
+        self.vectors.flush()
+        del self.vectors
+        self._records.close()
+        np.save(os.path.join(self.out_dir, OFFSETS_FILE), np.asarray(self.offsets, dtype=np.int64))
+
+        manifest = {
+            "count": count,
+            "dim": dim if count else 0,
+            **embed_manifest(self.profile),
+            "created_at": time.time(),
+        }
+        with open(os.path.join(self.out_dir, MANIFEST_FILE), "w") as f:
+            json.dump(manifest, f)
+        return manifest
+
+
+# --- Export a persisted llama-index index into the snapshot layout ---
+def export_snapshot(index, out_dir: str, profile: Optional[str] = None, node_ids=None) -> dict:
+    embedding_dict = index.vector_store.data.embedding_dict
+    node_ids = list(embedding_dict) if node_ids is None else list(node_ids)
+    dim = len(embedding_dict[node_ids[0]]) if node_ids else 0
+
+    writer = SnapshotWriter(out_dir, len(node_ids), dim, profile=profile)
+    for node_id in node_ids:
+        writer.add(index.docstore.get_node(node_id), embedding_dict[node_id])
+    return writer.close()
+
+
+# Everything is memory-mapped read-only, so pages are shared through the page
+# cache by every process that opens the same snapshot
+class SnapshotIndex:
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, MANIFEST_FILE)) as f:
+            self.manifest = json.load(f)
+        self.vectors = np.load(os.path.join(path, VECTORS_FILE), mmap_mode="r")
+        self.offsets = np.load(os.path.join(path, OFFSETS_FILE), mmap_mode="r")
+        with open(os.path.join(path, RECORDS_FILE), "rb") as f:
+            self._records = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.offsets[-1] else b""
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def record(self, i: int) -> dict:
+        return json.loads(self._records[self.offsets[i]:self.offsets[i + 1]])
+
+    # query_embedding may also be a (chunks, dim) matrix for a chunked job description;
+    # rows restricts the scan to those row positions (e.g. one language's assessments)
+    def search(
+        self,
+        query_embedding,
+        top_k: int = 10,
+        filters: Optional[dict] = None,
+        candidate_k: int = 200,
+        fusion: str = "max",
+        rows: Optional[np.ndarray] = None,
+    ):
+        vectors = self.vectors if rows is None else self.vectors[rows]
+        if len(vectors) == 0:
+            return []
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norms = np.linalg.norm(query, axis=-1, keepdims=True)
+        query = query / np.where(norms == 0, 1.0, norms)
+        scores = vectors @ query.T
+        if scores.ndim == 2:
+            scores = fuse_chunk_scores(scores, fusion)
+
+        # Over-fetch when filtering, since filters are applied to the ranked candidates
+        k = min(len(scores), candidate_k if filters else top_k)
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        candidates = candidates[np.argsort(-scores[candidates])]
+
+        results = []
+        for i in candidates:
+            record = self.record(int(i if rows is None else rows[i]))
+            if filters and not matches_filters(record["metadata"], **filters):
+                continue
+            results.append((record, float(scores[i])))
+            if len(results) == top_k:
+                break
+        return results
+
+    def warm(self):
+        # Fault the vectors into the page cache before taking traffic
+        float(np.asarray(self.vectors).sum())
+        return self
+
+    def close(self):
+        if isinstance(self._records, mmap.mmap):
+            self._records.close()
+
+
+# Swaps in newly published versions of a persist root in the background. Each
+# request reads .current once, so in-flight queries finish on the version they
+# started with and the old mapping is released when its last user is done.
+class LiveSnapshot:
+    def __init__(self, root: str):
+        self.root = root
+        path = resolve_persist_dir(root)
+        self.current = open_snapshot(path).warm()
+        self.embed_profile = read_embed_profile(path)
+        self._watcher = None
+
+    def watch(self, interval: float = 5.0):
+        self._watcher = VersionWatcher(self.root, self._swap, interval)
+        self._watcher.start()
+
+    def _swap(self, version: str, path: str):
+        # Queries are embedded by one long-lived model, so a version built with
+        # another profile can only be served after a restart
+        profile = read_embed_profile(path)
+        if embed_profile(profile) != embed_profile(self.embed_profile):
+            print(f"⚠️ Index version {version} uses embedding profile '{profile}'; restart to serve it.")
+            return
+        fresh = open_snapshot(path).warm()
+        self.current = fresh
+        print(f"🔄 Pid {os.getpid()} now serving index version {version} ({len(fresh)} assessments).")
+
+
+def open_snapshot(path: str):
+    from .shards import ShardedSnapshotIndex, is_sharded
+
+    return ShardedSnapshotIndex(path) if is_sharded(path) else SnapshotIndex(path)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--persist-dir", default=PERSIST_DIR)
+    parser.add_argument("--out", default="shl_snapshot")
+    parser.add_argument(
+        "--shard-by", choices=["hash", "language"], help="Write one snapshot per shard instead (hash keeps shards even)"
+    )
+    parser.add_argument("--shards", type=int, default=4, help="Shard count for --shard-by hash")
+    args = parser.parse_args(argv)
+
+    from .index import load_index
+
+    index = load_index(args.persist_dir)
+    profile = read_embed_profile(index_version_dir(index))
+    if args.shard_by:
+        from .shards import export_sharded_snapshot
+
+        manifest = export_sharded_snapshot(index, args.out, by=args.shard_by, num_shards=args.shards, profile=profile)
+        print(f"📸 {len(manifest['shards'])} shards by {args.shard_by} with {manifest['count']} assessments written to '{args.out}'.")
+        return 0
+    manifest = export_snapshot(index, args.out, profile=profile)
+    print(f"📸 Snapshot with {manifest['count']} vectors ({manifest['dim']} dims) written to '{args.out}'.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+import glob
+import json
+import os
+from typing import Optional
+
+from .ingestion import nodes_from_frame
+from .settings import configure_settings, embed_profile
+
+CHECKPOINT_FILE = "checkpoint.json"
+
+
+def _write_json_atomic(path: str, payload: dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+def _csv_fingerprint(csv_path: str) -> dict:
+    stat = os.stat(csv_path)
+    return {"csv_path": os.path.abspath(csv_path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def load_checkpoint(work_dir: str, csv_path: str, chunksize: int, profile: Optional[str] = None) -> dict:
+    fresh = {
+        **_csv_fingerprint(csv_path),
+        "chunksize": chunksize,
+        "embed_profile": embed_profile(profile),
+        "rows_done": 0,
+        "parts": [],
+        "complete": False,
+    }
+    path = os.path.join(work_dir, CHECKPOINT_FILE)
+    if not os.path.exists(path):
+        return fresh
+
+    with open(path) as f:
+        checkpoint = json.load(f)
+    # A changed CSV, chunk size or embedding profile invalidates the parts already written
+    keys = ("csv_path", "size", "mtime", "chunksize", "embed_profile")
+    same_source = all(checkpoint.get(k) == v for k, v in fresh.items() if k in keys)
+    return checkpoint if same_source else fresh
+
+
+# --- Embed the catalog chunk by chunk, checkpointing after every part ---
+def ingest_chunked(csv_path: str, work_dir: str, chunksize: int = 256, profile: Optional[str] = None) -> dict:
+    import numpy as np
+    from llama_index.core.schema import MetadataMode
+
+    from .catalog import iter_catalog_frames
+
+    os.makedirs(work_dir, exist_ok=True)
+    checkpoint = load_checkpoint(work_dir, csv_path, chunksize, profile)
+    if checkpoint["complete"]:
+        return checkpoint
+    if checkpoint["rows_done"]:
+        print(f"⏩ Resuming after {checkpoint['rows_done']} rows ({len(checkpoint['parts'])} parts).")
+    else:
+        # Parts left over from a different CSV, chunk size or profile must not be picked up
+        for stale in glob.glob(os.path.join(work_dir, "part-*")):
+            os.remove(stale)
+
+    from llama_index.core.settings import Settings
+
+    configure_settings(llm=False, profile=checkpoint["embed_profile"])
+    embed_model = Settings.embed_model
+    rows_done = checkpoint["rows_done"]
+    for chunk in iter_catalog_frames(csv_path, chunksize, skip_rows=rows_done):
+        nodes = nodes_from_frame(chunk, start_row=rows_done)
+        embeddings = embed_model.get_text_embedding_batch(
+            [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes]
+        )
+
+        part = f"part-{len(checkpoint['parts']):05d}"
+        tmp_embeddings_path = os.path.join(work_dir, f"{part}.npy.tmp")
+        with open(tmp_embeddings_path, "wb") as f:
+            np.save(f, np.asarray(embeddings, dtype=np.float32), allow_pickle=False)
+        os.replace(tmp_embeddings_path, os.path.join(work_dir, f"{part}.npy"))
+        tmp_nodes_path = os.path.join(work_dir, f"{part}.jsonl.tmp")
+        with open(tmp_nodes_path, "w") as f:
+            for node in nodes:
+                f.write(node.to_json() + "\n")
+        os.replace(tmp_nodes_path, os.path.join(work_dir, f"{part}.jsonl"))
+
+        rows_done += len(chunk)
+        checkpoint["parts"].append(part)
+        checkpoint["rows_done"] = rows_done
+        _write_json_atomic(os.path.join(work_dir, CHECKPOINT_FILE), checkpoint)
+        print(f"🧩 {part}: {rows_done} rows embedded.")
+
+    checkpoint["complete"] = True
+    _write_json_atomic(os.path.join(work_dir, CHECKPOINT_FILE), checkpoint)
+    return checkpoint
+
+
+def iter_parts(work_dir: str, parts):
+    import numpy as np
+    from llama_index.core.schema import TextNode
+
+    for part in parts:
+        embeddings = np.load(os.path.join(work_dir, f"{part}.npy"), mmap_mode="r")
+        with open(os.path.join(work_dir, f"{part}.jsonl")) as f:
+            nodes = [TextNode.from_json(line) for line in f]
+        yield nodes, embeddings
+
+
+def iter_part_rows(work_dir: str, parts):
+    for nodes, embeddings in iter_parts(work_dir, parts):
+        yield from zip(nodes, embeddings)
+
+
+def _write_json_maps(path: str, maps):
+    # {"name": {key: value, ...}, ...} written entry by entry, never held as one dict
+    with open(path, "w") as f:
+        f.write("{")
+        for i, (name, items) in enumerate(maps):
+            f.write(f"{', ' if i else ''}{json.dumps(name)}: {{")
+            for j, (key, value) in enumerate(items):
+                f.write(f"{', ' if j else ''}{json.dumps(key)}: {json.dumps(value)}")
+            f.write("}")
+        f.write("}")
+
+
+def _vector_store_metadata(node) -> dict:
+    from llama_index.core.vector_stores.utils import node_to_metadata_dict
+
+    # What SimpleVectorStore.add keeps per node
+    metadata = node_to_metadata_dict(node, remove_text=True, flat_metadata=False)
+    metadata.pop("_node_content", None)
+    return metadata
+
+
+def write_storage(work_dir: str, parts, out_dir: str):
+    from llama_index.core import StorageContext
+    from llama_index.core.data_structs import IndexDict
+    from llama_index.core.storage.docstore.utils import doc_to_json
+    from llama_index.core.storage.index_store.utils import index_struct_to_json
+
+    # Same files StorageContext.persist writes for a VectorStoreIndex; the empty
+    # graph and image stores come from llama-index itself, the rest is streamed
+    StorageContext.from_defaults().persist(persist_dir=out_dir)
+
+    def rows():
+        return iter_part_rows(work_dir, parts)
+
+    _write_json_maps(os.path.join(out_dir, "docstore.json"), [
+        ("docstore/data", ((node.node_id, doc_to_json(node)) for node, _ in rows())),
+        ("docstore/metadata", ((node.node_id, {"doc_hash": node.hash}) for node, _ in rows())),
+    ])
+    _write_json_maps(os.path.join(out_dir, "default__vector_store.json"), [
+        ("embedding_dict", ((node.node_id, embedding.tolist()) for node, embedding in rows())),
+        ("text_id_to_ref_doc_id", ((node.node_id, node.ref_doc_id or "None") for node, _ in rows())),
+        ("metadata_dict", ((node.node_id, _vector_store_metadata(node)) for node, _ in rows())),
+    ])
+    index_struct = IndexDict(nodes_dict={node.node_id: node.node_id for node, _ in rows()})
+    _write_json_maps(os.path.join(out_dir, "index_store.json"), [
+        ("index_store/data", [(index_struct.index_id, index_struct_to_json(index_struct))]),
+    ])
+
+
+def write_vectors(
+    work_dir: str,
+    parts,
+    out_dir: str,
+    projection_dims: int = 128,
+    shard_by: str = "",
+    num_shards: int = 4,
+    profile: Optional[str] = None,
+):
+    import numpy as np
+
+    from .coarse import ProjectionFitter, save_projection
+    from .shards import ShardedSnapshotWriter, shard_counts
+    from .snapshot import SnapshotWriter
+
+    # Row count and dimension come from the .npy headers; nothing is read yet
+    shapes = [np.load(os.path.join(work_dir, f"{part}.npy"), mmap_mode="r").shape for part in parts]
+    count, dim = sum(shape[0] for shape in shapes), (shapes[0][1] if shapes else 0)
+
+    if shard_by:
+        counts = shard_counts((node for node, _ in iter_part_rows(work_dir, parts)), shard_by, num_shards)
+        snapshot = ShardedSnapshotWriter(out_dir, counts, dim, by=shard_by, num_shards=num_shards, profile=profile)
+    else:
+        snapshot = SnapshotWriter(out_dir, count, dim, profile=profile)
+
+    # Normalized vectors for the projection go through a scratch memmap, one part at a time
+    full_path = os.path.join(out_dir, ".full.npy")
+    full = np.lib.format.open_memmap(full_path, mode="w+", dtype=np.float32, shape=(count, dim))
+    fitter = ProjectionFitter(projection_dims)
+    node_ids, row = [], 0
+    for nodes, embeddings in iter_parts(work_dir, parts):
+        batch = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(batch, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        full[row:row + len(batch)] = batch / norms
+        fitter.update(full[row:row + len(batch)])
+        row += len(batch)
+        for node, embedding in zip(nodes, embeddings):
+            snapshot.add(node, embedding)
+            node_ids.append(node.node_id)
+    snapshot.close()
+
+    try:
+        mean, components = fitter.fit()
+        save_projection(out_dir, node_ids, full, mean, components)
+    finally:
+        del full
+        os.remove(full_path)
+
+
+# --- Publish the embedded parts as a new index version without re-embedding ---
+# Stores, snapshot and projection are written straight from the part files, so
+# the catalog is never loaded into an in-memory VectorStoreIndex
+def assemble_index(
+    work_dir: str,
+    parts,
+    persist_dir: str,
+    projection_dims: int = 128,
+    profile: Optional[str] = None,
+    keep_versions: int = 3,
+    shard_by: Optional[str] = None,
+) -> str:
+    from .ingestion import shard_layout
+    from .versions import published_dir, prune_versions, staged_version
+
+    shard_by, num_shards = shard_layout(shard_by)
+    with staged_version(persist_dir) as staging_dir:
+        write_storage(work_dir, parts, staging_dir)
+        write_vectors(work_dir, parts, staging_dir, projection_dims, shard_by, num_shards, profile=embed_profile(profile))
+    prune_versions(persist_dir, keep=keep_versions)
+    return published_dir(staging_dir)
+
+
+def build_index_chunked(
+    csv_path: str,
+    persist_dir: str,
+    work_dir: Optional[str] = None,
+    chunksize: int = 256,
+    projection_dims: int = 128,
+    profile: Optional[str] = None,
+) -> str:
+    work_dir = work_dir or f"{persist_dir}.parts"
+    checkpoint = ingest_chunked(csv_path, work_dir, chunksize=chunksize, profile=profile)
+    # The published version directory, not a loaded index: loading it here would
+    # bring back the peak the part-by-part assembly avoids
+    return assemble_index(
+        work_dir, checkpoint["parts"], persist_dir, projection_dims=projection_dims, profile=checkpoint["embed_profile"]
+    )
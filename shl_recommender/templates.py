@@ -0,0 +1,167 @@
+"""Precomputed answers for recurring job-role queries.
+
+Usage: python -m shl_recommender.templates [--persist-dir shl_index] [--templates query_templates.txt]
+
+Runs every template query through the full pipeline once and saves the
+answers next to the index (<persist-dir>/template_cache.json). Query engines
+built over that index load the file and answer a request from it when its
+normalized text matches a template exactly, or when its embedding is within
+SHL_TEMPLATE_THRESHOLD cosine similarity of one. Entries belong to the index
+version they were computed against; an engine over any other version, or over
+an index that only lives in memory, ignores them.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from .cache import normalize_query
+from .settings import PERSIST_DIR
+from .versions import index_version_dir, split_version_dir
+
+TEMPLATE_CACHE_FILE = "template_cache.json"
+DEFAULT_TEMPLATES = "query_templates.txt"
+
+
+def template_cache_path(persist_dir: str) -> str:
+    return os.path.join(persist_dir, TEMPLATE_CACHE_FILE)
+
+
+def read_templates(path: str) -> List[str]:
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+class TemplateCache:
+    def __init__(self, version_dir: Optional[str] = None, threshold: float = 0.95):
+        # Saved under the persist root, tagged with the version the answers came from
+        self.persist_dir, self.version = split_version_dir(version_dir) if version_dir else (None, None)
+        self.threshold = threshold
+        self._entries = []
+        self._by_key = {}
+        self._matrix = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, query: str, embedding, response: str, source_nodes):
+        vector = np.asarray(embedding, dtype=np.float32)
+        vector = vector / (np.linalg.norm(vector) or 1.0)
+        with self._lock:
+            self._by_key[normalize_query(query)] = len(self._entries)
+            self._entries.append((query, vector, response, list(source_nodes)))
+            self._matrix = np.stack([entry[1] for entry in self._entries])
+
+    def _response(self, i: int, match: str):
+        from llama_index.core.base.response.schema import Response
+
+        query, _, response, source_nodes = self._entries[i]
+        return Response(
+            response=response,
+            source_nodes=list(source_nodes),
+            metadata={"cache_hit": True, "template": query, "template_match": match},
+        )
+
+    def lookup(self, query: str, embedding=None):
+        if not self._entries:
+            return None
+        i = self._by_key.get(normalize_query(query))
+        if i is not None:
+            return self._response(i, "exact")
+        if embedding is None:
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        scores = self._matrix @ (vector / (np.linalg.norm(vector) or 1.0))
+        best = int(np.argmax(scores))
+        if scores[best] >= self.threshold:
+            return self._response(best, "similar")
+        return None
+
+    # --- Persist alongside the index ---
+    def save(self, path: Optional[str] = None) -> str:
+        path = path or template_cache_path(self.persist_dir)
+        payload = {
+            "version": self.version,
+            "entries": [
+                {
+                    "query": query,
+                    "embedding": vector.tolist(),
+                    "response": response,
+                    "nodes": [{"id": n.node.node_id, "score": n.score} for n in source_nodes],
+                }
+                for query, vector, response, source_nodes in self._entries
+            ],
+        }
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, index, threshold: float = 0.95, path: Optional[str] = None):
+        from llama_index.core.schema import NodeWithScore
+
+        # Answers are only valid for the persisted version they were computed against
+        version_dir = index_version_dir(index)
+        cache = cls(version_dir, threshold)
+        if version_dir is None:
+            return cache
+        path = path or template_cache_path(cache.persist_dir)
+        if not os.path.exists(path):
+            return cache
+        with open(path) as f:
+            payload = json.load(f)
+        if payload.get("version") != cache.version:
+            print(f"⚠️ Ignoring template cache built for index version {payload.get('version')}.")
+            return cache
+        skipped = 0
+        for entry in payload["entries"]:
+            nodes = [index.docstore.get_node(n["id"], raise_error=False) for n in entry["nodes"]]
+            # An answer citing assessments this index lacks would be wrong, not just stale
+            if any(node is None for node in nodes):
+                skipped += 1
+                continue
+            scored = [NodeWithScore(node=node, score=n["score"]) for node, n in zip(nodes, entry["nodes"])]
+            cache.add(entry["query"], entry["embedding"], entry["response"], scored)
+        if skipped:
+            print(f"⚠️ Skipped {skipped} template answers citing assessments missing from the index.")
+        return cache
+
+
+def warm_templates(query_engine, queries: List[str], cache: TemplateCache, embed_model) -> TemplateCache:
+    for query in queries:
+        response = query_engine.query(query)
+        cache.add(query, embed_model.get_query_embedding(query), response.response or "", response.source_nodes)
+    return cache
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--persist-dir", default=PERSIST_DIR)
+    parser.add_argument("--templates", default=DEFAULT_TEMPLATES)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    from llama_index.core.settings import Settings
+
+    from .index import load_index
+    from .query import build_query_engine
+
+    queries = read_templates(args.templates)
+    index = load_index(args.persist_dir)
+    # Engine without a template cache, so every template runs the full pipeline
+    query_engine = build_query_engine(index, similarity_top_k=args.top_k, template_cache=False)
+    cache = warm_templates(query_engine, queries, TemplateCache(index_version_dir(index)), Settings.embed_model)
+    path = cache.save()
+    print(f"🔥 Cached answers for {len(cache)} template queries in '{path}'.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""Summarize a JSONL trace sink.
+
+Usage: python -m shl_recommender.trace_report traces.jsonl
+Prints per-stage latency percentiles and histograms.
+"""
+import bisect
+import json
+import sys
+
+from .benchmark import percentile
+from .tracing import BUCKET_BOUNDS_MS
+
+
+# --- Aggregate a JSONL sink into per-stage percentiles and histograms ---
+def summarize(path: str) -> dict:
+    durations = {}
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            trace = json.loads(line)
+            durations.setdefault(trace["name"], []).append(trace["duration_ms"])
+            for s in trace["spans"]:
+                durations.setdefault(s["name"], []).append(s["duration_ms"])
+
+    summary = {}
+    for stage, values in durations.items():
+        values.sort()
+        buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        for v in values:
+            buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, v)] += 1
+        summary[stage] = {
+            "count": len(values),
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99),
+            "buckets": buckets,
+        }
+    return summary
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print(__doc__.strip().splitlines()[2])
+        return 2
+
+    labels = [f"≤{b}" for b in BUCKET_BOUNDS_MS] + [f">{BUCKET_BOUNDS_MS[-1]}"]
+    for stage, stats in summarize(argv[0]).items():
+        print(f"{stage}: n={stats['count']} p50={stats['p50_ms']:.1f}ms "
+              f"p95={stats['p95_ms']:.1f}ms p99={stats['p99_ms']:.1f}ms")
+        print("    " + " ".join(f"{label}ms:{n}" for label, n in zip(labels, stats["buckets"]) if n))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""Per-stage request timing.
+
+Tracing is off unless SHL_TRACE=1 or a caller starts a trace explicitly; while
+off, span() is a single context-variable lookup returning a shared no-op.
+SHL_TRACE_JSONL=<path> appends finished traces to a JSONL file and
+SHL_TRACE_OPIK=1 also exports them through opik; summarize a JSONL sink with
+python -m shl_recommender.trace_report.
+"""
+import bisect
+import json
+import os
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+BUCKET_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000]
+
+_current_trace: ContextVar = ContextVar("shl_current_trace", default=None)
+
+
+class _NoopSpan:
+    spans = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def breakdown(self):
+        return []
+
+
+_NOOP = _NoopSpan()
+
+
+class StageHistograms:
+    def __init__(self):
+        self._counts = {}
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, duration_ms: float):
+        with self._lock:
+            counts = self._counts.setdefault(stage, [0] * (len(BUCKET_BOUNDS_MS) + 1))
+            counts[bisect.bisect_left(BUCKET_BOUNDS_MS, duration_ms)] += 1
+            self._totals[stage] = self._totals.get(stage, 0.0) + duration_ms
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                stage: {"count": sum(counts), "total_ms": self._totals[stage], "buckets": list(counts)}
+                for stage, counts in self._counts.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+            self._totals.clear()
+
+
+HISTOGRAMS = StageHistograms()
+
+
+class _Span:
+    __slots__ = ("trace", "name", "start")
+
+    def __init__(self, trace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.trace.spans.append({
+            "name": self.name,
+            "start_ms": (self.start - self.trace.start) * 1000,
+            "duration_ms": (end - self.start) * 1000,
+        })
+        HISTOGRAMS.observe(self.name, (end - self.start) * 1000)
+        return False
+
+
+class Trace:
+    def __init__(self, name: str, attributes: Optional[dict] = None):
+        self.name = name
+        self.attributes = attributes or {}
+        self.spans = []
+        self.start = time.perf_counter()
+        self.started_at = datetime.now(timezone.utc)
+        self.duration_ms = None
+        self._token = None
+
+    def __enter__(self):
+        self._token = _current_trace.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.duration_ms = (time.perf_counter() - self.start) * 1000
+        _current_trace.reset(self._token)
+        HISTOGRAMS.observe(self.name, self.duration_ms)
+        _export(self)
+        return False
+
+    def breakdown(self):
+        return [(s["name"], s["duration_ms"]) for s in self.spans]
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "spans": self.spans,
+        }
+
+
+def tracing_enabled() -> bool:
+    return os.getenv("SHL_TRACE", "0") == "1"
+
+
+def start_trace(name: str, enabled: Optional[bool] = None, **attributes):
+    # Nested traces are folded into the outer one
+    if _current_trace.get() is not None:
+        return _NOOP
+    if enabled is None:
+        enabled = tracing_enabled()
+    return Trace(name, attributes) if enabled else _NOOP
+
+
+def span(name: str):
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP
+    return _Span(trace, name)
+
+
+# --- Sinks ---
+_sink_lock = threading.Lock()
+
+
+def _export(trace: Trace):
+    path = os.getenv("SHL_TRACE_JSONL")
+    if path:
+        with _sink_lock, open(path, "a") as f:
+            f.write(json.dumps(trace.to_dict()) + "\n")
+    if os.getenv("SHL_TRACE_OPIK", "0") == "1":
+        _export_opik(trace)
+
+
+_opik_client = None
+
+
+def _get_opik_client():
+    global _opik_client
+
+    # One client (and one background streamer) per process, created on first export
+    with _sink_lock:
+        if _opik_client is None:
+            import opik
+
+            _opik_client = opik.Opik()
+        return _opik_client
+
+
+def _export_opik(trace: Trace):
+    from datetime import timedelta
+
+    try:
+        opik_trace = _get_opik_client().trace(
+            name=trace.name,
+            start_time=trace.started_at,
+            end_time=trace.started_at + timedelta(milliseconds=trace.duration_ms),
+            metadata=trace.attributes,
+        )
+        for s in trace.spans:
+            start_time = trace.started_at + timedelta(milliseconds=s["start_ms"])
+            opik_trace.span(
+                name=s["name"],
+                start_time=start_time,
+                end_time=start_time + timedelta(milliseconds=s["duration_ms"]),
+            )
+    except Exception as e:
+        # Telemetry must never fail a request
+        print(f"⚠️ opik export failed: {e}", file=sys.stderr)
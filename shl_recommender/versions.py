@@ -0,0 +1,134 @@
+import os
+import secrets
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional, Tuple
+
+# A persist root holds immutable versions plus a pointer to the live one:
+#   <root>/versions/<version>/...   never modified after publish
+#   <root>/CURRENT                  name of the live version, swapped with os.replace
+# Roots without CURRENT are treated as a legacy flat index directory.
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+STAGING_PREFIX = ".staging-"
+
+
+def current_version(root: str) -> Optional[str]:
+    try:
+        with open(os.path.join(root, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def resolve_persist_dir(root: str) -> str:
+    version = current_version(root)
+    return os.path.join(root, VERSIONS_DIR, version) if version else root
+
+
+def split_version_dir(version_dir: str) -> Tuple[str, Optional[str]]:
+    # <root>/versions/<version> -> (root, version); a legacy flat directory is its own root
+    path = os.path.normpath(version_dir)
+    parent, version = os.path.split(path)
+    if os.path.basename(parent) == VERSIONS_DIR:
+        return os.path.dirname(parent), version
+    return path, None
+
+
+# CURRENT can move at any time, so an index remembers the version directory it
+# was loaded from; its projection, template answers and embedding profile are
+# read from that directory, never re-resolved from the root
+def bind_version_dir(index, version_dir: str):
+    index.shl_version_dir = version_dir
+    return index
+
+
+def index_version_dir(index) -> Optional[str]:
+    # None for an index that only lives in memory
+    return getattr(index, "shl_version_dir", None)
+
+
+def has_index(root: str) -> bool:
+    return current_version(root) is not None or os.path.exists(os.path.join(root, "docstore.json"))
+
+
+def _fsync_dir(path: str):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def publish(root: str, version: str, staging_dir: str) -> str:
+    final_dir = os.path.join(root, VERSIONS_DIR, version)
+    os.rename(staging_dir, final_dir)
+    _fsync_dir(os.path.dirname(final_dir))
+
+    # Readers see either the old pointer or the new one, never a partial write
+    tmp_pointer = os.path.join(root, f".{CURRENT_FILE}.{os.getpid()}")
+    with open(tmp_pointer, "w") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_pointer, os.path.join(root, CURRENT_FILE))
+    _fsync_dir(root)
+    return final_dir
+
+
+@contextmanager
+def staged_version(root: str):
+    # Sortable by publish time, unique across concurrent builders
+    now = time.time()
+    version = time.strftime("%Y%m%dT%H%M%S", time.gmtime(now)) + f"{int(now * 1000) % 1000:03d}-{secrets.token_hex(3)}"
+    staging_dir = os.path.join(root, VERSIONS_DIR, f"{STAGING_PREFIX}{version}")
+    os.makedirs(staging_dir)
+    try:
+        yield staging_dir
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+    publish(root, version, staging_dir)
+
+
+def published_dir(staging_dir: str) -> str:
+    # Where staged_version moves a staging directory once it is published
+    head, name = os.path.split(staging_dir)
+    return os.path.join(head, name[len(STAGING_PREFIX):])
+
+
+def prune_versions(root: str, keep: int = 3):
+    versions_dir = os.path.join(root, VERSIONS_DIR)
+    live = current_version(root)
+    versions = sorted(v for v in os.listdir(versions_dir) if not v.startswith("."))
+    # Processes that still map an old version keep its inodes alive after removal
+    for version in versions[:-keep] if keep else versions:
+        if version != live:
+            shutil.rmtree(os.path.join(versions_dir, version), ignore_errors=True)
+
+
+# Polls the pointer and hands each newly published version to on_change,
+# which loads it in the background before swapping it in
+class VersionWatcher(threading.Thread):
+    def __init__(self, root: str, on_change: Callable[[str, str], None], interval: float = 5.0):
+        super().__init__(daemon=True, name="shl-version-watcher")
+        self.root = root
+        self.on_change = on_change
+        self.interval = interval
+        self.version = current_version(root)
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            version = current_version(self.root)
+            if version and version != self.version:
+                try:
+                    self.on_change(version, os.path.join(self.root, VERSIONS_DIR, version))
+                    self.version = version
+                except Exception as e:
+                    print(f"⚠️ Failed to load index version {version}: {e}")
+
+    def stop(self):
+        self._stopped.set()
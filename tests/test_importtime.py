@@ -0,0 +1,8 @@
+from shl_recommender.importtime import HEAVY_MODULES, measure_import
+
+
+def test_package_import_stays_lightweight():
+    # Only the heavy-module check: wall-clock budgets are too noisy for CI
+    _, loaded_heavy = measure_import("shl_recommender")
+
+    assert loaded_heavy == [], f"imported eagerly: {loaded_heavy} (watched: {HEAVY_MODULES})"
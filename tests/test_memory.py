@@ -0,0 +1,85 @@
+import hashlib
+import re
+import tracemalloc
+
+import numpy as np
+import pytest
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.schema import TextNode
+
+import shl_recommender.settings as settings
+from shl_recommender.ingestion import build_index
+from shl_recommender.memory import check_budgets, profile_load, profile_queries
+
+QUERIES = [
+    {"query": "Java developer who collaborates with business teams"},
+    {"query": "Entry-level sales role, 30 minute assessment"},
+    {"query": "Python, SQL and JavaScript for a mid-level engineer"},
+    {"query": "Personality test for a manager"},
+]
+
+
+# Signed bag of words: deterministic, no model download
+class StubEmbedding(BaseEmbedding):
+    dim: int = 64
+
+    def _embed(self, text: str):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in re.findall(r"[a-z]+", text.lower()):
+            h = int(hashlib.md5(token.encode()).hexdigest(), 16)
+            vector[h % self.dim] += 1.0 if (h >> 8) & 1 else -1.0
+        return vector.tolist()
+
+    def _get_query_embedding(self, query: str):
+        return self._embed(query)
+
+    def _get_text_embedding(self, text: str):
+        return self._embed(text)
+
+    async def _aget_query_embedding(self, query: str):
+        return self._embed(query)
+
+
+def _nodes(count: int = 40):
+    skills = ["Java", "Python", "SQL", "Sales", "Personality", "Numerical", "Verbal", "Leadership"]
+    for i in range(count):
+        skill = skills[i % len(skills)]
+        yield TextNode(
+            id_=f"assessment-{i}",
+            text=f"Assessment: {skill} {i}\nDescription: Measures {skill.lower()} ability for level {i % 5}.",
+            metadata={
+                "assessment_name": f"{skill} {i}",
+                "type": "Knowledge & Skills" if i % 2 else "Personality & Behavior",
+                "duration_minutes": 10 + i % 50,
+                "remote": "Yes" if i % 3 else "No",
+                "adaptive": "No" if i % 4 else "Yes",
+                "job_levels": "Entry-Level, Manager" if i % 2 else "Mid-Professional",
+                "languages": "English (USA)",
+                "url": f"https://example.com/assessments/{i}/",
+            },
+        )
+
+
+@pytest.fixture
+def persist_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "get_embed_model", lambda profile=None: StubEmbedding())
+    monkeypatch.setenv("SHL_LLM_BACKEND", "mock")
+    monkeypatch.setenv("SHL_SEARCH_MODE", "dense")
+    # Every query runs the full path, as python -m shl_recommender.memory does
+    for name in ("SHL_LLM_CACHE_TTL", "SHL_TEMPLATE_CACHE", "SHL_FACET_CACHE_TTL"):
+        monkeypatch.setenv(name, "0")
+    persist_dir = str(tmp_path / "index")
+    build_index(_nodes(), persist_dir, projection_dims=16)
+    return persist_dir
+
+
+def test_steady_state_memory_within_budget(persist_dir):
+    tracemalloc.start()
+    try:
+        pipeline, _ = profile_load(persist_dir, top=0)
+        steady = profile_queries(pipeline, QUERIES, repeat=60, warmup=2, top=0)
+    finally:
+        tracemalloc.stop()
+
+    assert steady["queries"] == 60
+    assert check_budgets(steady, budget_mb=32, heap_budget_mb=8, alloc_budget_mb=64) == []
@@ -1,88 +1,10 @@
 import streamlit as st
-import os
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-from llama_index.core import VectorStoreIndex, StorageContext, load_index_from_storage
-from llama_index.core.schema import TextNode
-from llama_index.embeddings.fastembed import FastEmbedEmbedding
-from llama_index.core.settings import Settings
-from llama_index.llms.groq import Groq
-from llama_index.core.response_synthesizers import CompactAndRefine
 from dotenv import load_dotenv
 
-load_dotenv()
+from shl_recommender.pipeline import QueryPipeline
+from shl_recommender.tracing import HISTOGRAMS, start_trace
 
-# --- Set up Llama 4 model from Groq ---
-model_name = "meta-llama/llama-4-scout-17b-16e-instruct"
-Settings.llm = Groq(model=model_name, api_key=os.getenv("GROQ_API_KEY"))
-
-# --- Set embedding model ---
-Settings.embed_model = FastEmbedEmbedding(model_name="BAAI/bge-large-en-v1.5")
-
-# --- Helper: Extract job description text from URL ---
-def extract_text_from_url(url: str) -> str:
-    try:
-        response = requests.get(url, timeout=10)
-        soup = BeautifulSoup(response.content, "html.parser")
-        paragraphs = soup.find_all("p")
-        text = "\n".join([p.get_text() for p in paragraphs if p.get_text().strip()])
-        return text.strip()
-    except Exception as e:
-        return f"Error extracting content from URL: {str(e)}"
-
-# --- Load SHL assessments into nodes with metadata ---
-def load_shl_data_with_metadata(csv_path: str):
-    df = pd.read_csv(csv_path)
-    documents = []
-
-    for _, row in df.iterrows():
-        assessment_name = str(row['Assessment Name'])
-        description = str(row['Description'])
-        assessment_type = str(row['Types']).strip()
-        raw_duration = str(row['Assessment Length (minutes)']).strip()
-        remote = str(row['Remote Support']).strip()
-        adaptive = str(row['Adaptive Support']).strip()
-        job_levels = str(row['Job Levels']).strip()
-        url = str(row['URL']).strip()
-
-        try:
-            minutes = int(float(raw_duration))
-            if minutes == 9999:
-                duration_clean = "Untimed"
-            elif minutes == -1:
-                duration_clean = "Variable"
-            else:
-                duration_clean = f"{minutes} minutes"
-        except ValueError:
-            duration_clean = "Variable"
-            minutes = -1
-
-        text = f"""
-        Assessment: {assessment_name}
-        Description: {description}
-        Type: {assessment_type}
-        Duration: {duration_clean}
-        Remote: {remote}
-        Adaptive: {adaptive}
-        Job Levels: {job_levels}
-        URL: {url}
-        """
-
-        metadata = {
-            "assessment_name": assessment_name,
-            "type": assessment_type,
-            "duration_minutes": minutes,
-            "remote": remote,
-            "adaptive": adaptive,
-            "job_levels": job_levels,
-            "url": url
-        }
-
-        node = TextNode(text=text.strip(), metadata=metadata)
-        documents.append(node)
-
-    return documents
+load_dotenv()
 
 def run_streamlit_app():
     st.set_page_config(page_title="SHL Assessment Recommender", layout="wide")
@@ -91,69 +13,123 @@ def run_streamlit_app():
     # User input
     user_input = st.text_input("Enter a job description or a URL pointing to one:", "")
 
+    # Debug mode shows where the request time went
+    debug = st.sidebar.checkbox("🐞 Debug timings", value=False)
+
+    # Index and embedder start loading on the first page view, while the user types
+    catalog_path = "catalog.parquet"  # normalized from the scraped CSVs on first use
+    pipeline = load_pipeline(catalog_path, "shl_index")
+
     if st.button("🔍 Find Relevant Assessments") and user_input:
-        if user_input.startswith("http://") or user_input.startswith("https://"):
-            query = extract_text_from_url(user_input)
+        with start_trace("streamlit_query", enabled=debug or None) as trace:
+            find_assessments(pipeline, user_input)
+
+        if debug and trace.spans:
+            show_timings(trace)
+
+    # Refining re-runs the script, but only pages through the cached candidates
+    if "candidates" in st.session_state:
+        show_results(st.session_state["candidates"], st.session_state.get("summary", ""))
+
+
+def show_timings(trace):
+    import pandas as pd
+
+    st.markdown("### ⏱️ Timing Breakdown")
+    rows = [{"Stage": name, "Duration (ms)": round(ms, 1)} for name, ms in trace.breakdown()]
+    rows.append({"Stage": "total", "Duration (ms)": round(trace.duration_ms, 1)})
+    st.table(pd.DataFrame(rows))
+
+    with st.expander("Stage histograms (this process)"):
+        st.json(HISTOGRAMS.snapshot())
+
+
+# One pipeline (index, embedder, query engine) per server process, not per click;
+# it swaps in newly published index versions by itself
+@st.cache_resource
+def load_pipeline(catalog_path: str, persist_dir: str):
+    return QueryPipeline(catalog_path, persist_dir, similarity_top_k=10)
+
+
+def find_assessments(pipeline: QueryPipeline, user_input: str):
+    def show_preview(query: str):
+        if query and query != user_input:
             st.markdown("**🔍 Extracted job description from URL (preview):**")
             st.write(query[:500] + "..." if len(query) > 500 else query)
-        else:
-            query = user_input
-
-        if not query:
-            st.error("❌ No valid query found.")
-            return
-
-        # Load index
-        csv_path = "rex.csv"
-        persist_dir = "shl_index"
-
-        if not os.path.exists(persist_dir):
-            nodes = load_shl_data_with_metadata(csv_path)
-            index = VectorStoreIndex(nodes)
-            index.storage_context.persist(persist_dir=persist_dir)
-        else:
-            storage_context = StorageContext.from_defaults(persist_dir=persist_dir)
-            index = load_index_from_storage(storage_context)
-
-        # Run the query
-        query_engine = index.as_query_engine(
-            similarity_top_k=10,
-            response_mode="compact_and_refine",
-            response_synthesizer=CompactAndRefine()
-        )
-        response = query_engine.query(query)
-
-        # Create table of results
-        records = []
-        for node in response.source_nodes:
-            meta = node.node.metadata
-            records.append({
-                "Assessment Name": meta["assessment_name"],
-                "Remote Support": meta["remote"],
-                "Adaptive Support": meta["adaptive"],
-                "Duration": "Untimed" if meta["duration_minutes"] == 9999 else f"{meta['duration_minutes']} mins",
-                "Type": meta["type"],
-                "URL": meta["url"]
-            })
-
-        if records:
-            df = pd.DataFrame(records)
-            
-            # Keep Assessment Name and URL in separate columns
-            df["Link"] = df["URL"].apply(lambda url: f"[Link]({url})")
-            
-            # Optionally drop the raw URL column if you only want the clickable link
-            df.drop(columns=["URL"], inplace=True)
-
-            st.markdown("### 📋 Top Recommended Assessments")
-            st.markdown(df.to_markdown(index=False), unsafe_allow_html=True)
-        else:
-            st.warning("No relevant assessments found.")
 
+    # The top 200 feed the facets and render while the LLM summarizes the top 10
+    table = st.empty()
 
-        # Show LLM output
-        st.markdown("### 🧠 LLM-Synthesized Summary")
-        st.markdown(response.response)
+    def show_candidates(query_bundle, nodes, candidates):
+        st.session_state["candidates"] = candidates
+        with table.container():
+            st.markdown("### 📋 Top Recommended Assessments")
+            st.dataframe([node.node.metadata for node in candidates.page(1, 10)["results"]])
+            st.info("🧠 Generating summary...")
+
+    query, response = pipeline.run(user_input, on_query_text=show_preview, on_results=show_candidates, candidates=True)
+    table.empty()
+    if not query:
+        st.session_state.pop("candidates", None)
+        st.error("❌ No valid query found.")
+        return
+    st.session_state["summary"] = response.response
+
+
+def show_results(candidates, summary: str):
+    with st.sidebar:
+        st.markdown("### 🔎 Refine results")
+        facets = candidates.facets()
+        remote = st.radio("Remote Support", ["Any", *facets["remote"]], horizontal=True)
+        adaptive = st.radio("Adaptive Support", ["Any", *facets["adaptive"]], horizontal=True)
+        types = st.multiselect("Type", list(facets["type"]), format_func=lambda t: f"{t} ({facets['type'][t]})")
+        max_duration = st.slider("Max duration (minutes, 120 = any)", 5, 120, 120, step=5)
+
+    filters = {
+        "remote": None if remote == "Any" else remote,
+        "adaptive": None if adaptive == "Any" else adaptive,
+        "types": types or None,
+        "max_duration": None if max_duration == 120 else max_duration,
+    }
+    first = candidates.page(1, 10, **filters)
+    page = st.number_input("Page", min_value=1, max_value=first["pages"], value=1) if first["pages"] > 1 else 1
+    result = candidates.page(page, 10, **filters) if page > 1 else first
+
+    # Create table of results
+    records = []
+    for node in result["results"]:
+        meta = node.node.metadata
+        records.append({
+            "Assessment Name": meta["assessment_name"],
+            "Remote Support": meta["remote"],
+            "Adaptive Support": meta["adaptive"],
+            "Duration": "Untimed" if meta["duration_minutes"] == 9999 else f"{meta['duration_minutes']} mins",
+            "Type": meta["type"],
+            "URL": meta["url"]
+        })
+
+    if records:
+        import pandas as pd
+
+        df = pd.DataFrame(records)
+        
+        # Keep Assessment Name and URL in separate columns
+        df["Link"] = df["URL"].apply(lambda url: f"[Link]({url})")
+        
+        # Optionally drop the raw URL column if you only want the clickable link
+        df.drop(columns=["URL"], inplace=True)
+
+        st.markdown(f"### 📋 Top Recommended Assessments ({result['total']} of {len(candidates)} candidates)")
+        st.markdown(df.to_markdown(index=False), unsafe_allow_html=True)
+        with st.expander("Facet counts"):
+            st.json(result["facets"])
+    else:
+        st.warning("No relevant assessments found.")
+
+
+    # Show LLM output
+    st.markdown("### 🧠 LLM-Synthesized Summary")
+    st.markdown(summary)
 
 
 if __name__ == "__main__":